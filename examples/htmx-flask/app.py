@@ -6,161 +6,2268 @@ A Flask application demonstrating how to use Ty web components
 with HTMX for dynamic, server-rendered interactions.
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, current_app, render_template, request, jsonify, redirect, url_for, make_response, send_file
+from flask import g, before_render_template, template_rendered
 from flask_compress import Compress
-from datetime import datetime, timedelta
+from jinja2 import FileSystemBytecodeCache
+
+try:
+    import brotli
+except ImportError:  # Brotli sidecars are skipped without it
+    brotli = None
+try:
+    import fcntl
+except ImportError:  # No journal lock on Windows; run a single process there
+    fcntl = None
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import bisect
+import calendar as calendar_lib
+import copy
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
+import logging
+import mimetypes
+import os
+import queue
 import random
+import re
+import secrets
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+
+app = Flask(__name__)
+app.secret_key = "demo-key-change-in-production"
+
+# Compression configuration (Flask-Compress is initialized below, once the
+# compressed-response cache exists)
+app.config['COMPRESS_MIMETYPES'] = [
+    'text/html', 'text/css', 'text/xml',
+    'application/json', 'application/javascript',
+    'application/xml+rss', 'application/atom+xml',
+    'text/javascript', 'image/svg+xml'
+]
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 500
+# Brotli first: at quality 4 it costs about the same CPU as gzip -6 and
+# produces noticeably smaller HTML/JSON; clients without it get gzip
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_BR_LEVEL'] = 4
+
+# Adaptive compression: drop to the minimum level when this many requests
+# are in flight, use the maximum level when at most IDLE are, and stop
+# compressing endpoints whose output stays above SKIP_RATIO of the input
+# (re-measured every PROBE_EVERY responses)
+app.config['COMPRESS_ADAPTIVE'] = os.environ.get('TY_DEMO_COMPRESS_ADAPTIVE', '1') != '0'
+app.config['COMPRESS_ADAPTIVE_SATURATED'] = int(os.environ.get('TY_DEMO_COMPRESS_SATURATED', 16))
+app.config['COMPRESS_ADAPTIVE_IDLE'] = 1
+app.config['COMPRESS_ADAPTIVE_LEVELS'] = {'gzip': (1, 9), 'br': (1, 6)}
+app.config['COMPRESS_ADAPTIVE_SKIP_RATIO'] = 0.9
+app.config['COMPRESS_ADAPTIVE_PROBE_EVERY'] = 20
+
+# Compressed bodies reused for byte-identical responses (LRU)
+app.config['COMPRESS_RESPONSE_CACHE_SIZE'] = 1024
+app.config['COMPRESS_RESPONSE_CACHE_MAX_BYTES'] = int(os.environ.get('TY_DEMO_COMPRESS_CACHE_BYTES', 16 * 1024 * 1024))
+
+# Startup warmup: precompile templates (with an on-disk bytecode cache so
+# restarts skip compilation) and prefill month events around today
+app.config['WARMUP_ENABLED'] = os.environ.get('TY_DEMO_WARMUP', '1') != '0'
+app.config['WARMUP_MONTHS_BEFORE'] = 3
+app.config['WARMUP_MONTHS_AFTER'] = 12
+app.config['JINJA_BYTECODE_DIR'] = os.path.join(app.instance_path, 'jinja-bytecode')
+
+# Must be set before the Jinja environment is first created
+os.makedirs(app.config['JINJA_BYTECODE_DIR'], exist_ok=True)
+app.jinja_options = {**app.jinja_options,
+                     'bytecode_cache': FileSystemBytecodeCache(app.config['JINJA_BYTECODE_DIR'])}
+
+# Static asset pipeline: content-hashed file names plus .gz/.br sidecars
+# compressed once at maximum level, served with immutable caching. In debug
+# mode sources are re-checked on every request so watcher rebuilds show up.
+app.config['STATIC_PIPELINE_ENABLED'] = os.environ.get('TY_DEMO_STATIC_PIPELINE', '1') != '0'
+app.config['STATIC_BUILD_DIR'] = os.path.join(app.instance_path, 'static-build')
+app.config['STATIC_PIPELINE_EXTENSIONS'] = ('.css', '.js', '.svg', '.json')
+
+# Durable storage: every mutation is appended to a journal under the instance
+# folder; set TY_DEMO_JOURNAL=0 to keep everything in memory only
+app.config['JOURNAL_ENABLED'] = os.environ.get('TY_DEMO_JOURNAL', '1') != '0'
+app.config['JOURNAL_DIR'] = os.path.join(app.instance_path, 'journal')
+app.config['JOURNAL_SNAPSHOT_EVERY'] = 1000  # records between compacted snapshots
+app.config['JOURNAL_COMMIT_INTERVAL'] = 0.005  # seconds to gather a group commit
+
+# Storage backend: "memory" (journaled, per process) or "sqlite" (shared by
+# every worker process on the host)
+app.config['STORAGE_BACKEND'] = os.environ.get('TY_DEMO_STORAGE', 'memory')
+app.config['SQLITE_PATH'] = os.path.join(app.instance_path, 'demo.sqlite3')
+app.config['SQLITE_POOL_SIZE'] = 8  # idle connections kept per process
+
+# Event change feed (/api/calendar/changes): how long changes are retained,
+# the in-memory log's entry limit, the most changes per response and how
+# often open pages poll
+app.config['CHANGE_LOG_RETENTION'] = int(os.environ.get('TY_DEMO_CHANGE_RETENTION', 3600))
+app.config['CHANGE_LOG_MAX_ENTRIES'] = 10000
+app.config['CHANGE_FEED_PAGE_SIZE'] = 500
+app.config['CHANGE_FEED_POLL_INTERVAL'] = '5s'
+
+# Browser/proxy cache lifetime for responses that depend only on their URL
+app.config['CALENDAR_CACHE_MAX_AGE'] = 3600
+
+# Longest span accepted by /api/calendar/events?from=...&to=...
+app.config['CALENDAR_MAX_RANGE_DAYS'] = 366
+
+# Number of generated months kept in memory (LRU)
+app.config['MONTH_EVENTS_CACHE_SIZE'] = int(os.environ.get('TY_DEMO_MONTH_CACHE_SIZE', 120))
+
+# Rendered HTMX partials kept in memory (LRU, bounded by count and total size)
+app.config['FRAGMENT_CACHE_SIZE'] = 4096
+app.config['FRAGMENT_CACHE_MAX_BYTES'] = int(os.environ.get('TY_DEMO_FRAGMENT_CACHE_BYTES', 8 * 1024 * 1024))
+
+# Search/filter results by normalized query parameters (LRU with expiry)
+app.config['QUERY_CACHE_SIZE'] = 2048
+app.config['QUERY_CACHE_TTL'] = float(os.environ.get('TY_DEMO_QUERY_CACHE_TTL', 30))
+
+# User search: results per page (``limit`` is clamped to the maximum) and
+# the longest prefix kept in the prefix map
+app.config['USER_SEARCH_PAGE_SIZE'] = 20
+app.config['USER_SEARCH_MAX_PAGE_SIZE'] = 100
+app.config['USER_SEARCH_PREFIX_LENGTH'] = 3
+
+# Slow upstream calls run on a dedicated I/O pool; the request returns a
+# placeholder that polls for the result every POLL_INTERVAL
+app.config['IO_EXECUTOR_WORKERS'] = int(os.environ.get('TY_DEMO_IO_WORKERS', 32))
+app.config['DEFERRED_RESULT_TTL'] = 60
+app.config['DEFERRED_POLL_INTERVAL'] = '250ms'
+
+# Upstream lookups (weather, service checks): seconds a result stays fresh,
+# then how many more seconds it may be served stale while one background
+# refresh runs. Concurrent misses for a key share a single fetch.
+app.config['UPSTREAM_CACHE_POLICIES'] = {
+    'weather': (300, 1800),
+    'system-status': (10, 60),
+}
+
+# System status: every service is checked concurrently on a bounded pool;
+# checks slower than SERVICE_CHECK_TIMEOUT seconds render as timed out
+# (they keep running and refresh the cache for the next viewer)
+app.config['SERVICE_CHECK_WORKERS'] = 8
+app.config['SERVICE_CHECK_TIMEOUT'] = 1.0
+
+# Background jobs (contact form, wizard): worker threads, bounded queue,
+# retries with exponential backoff and how long finished results are kept
+app.config['JOB_WORKERS'] = int(os.environ.get('TY_DEMO_JOB_WORKERS', 4))
+app.config['JOB_QUEUE_SIZE'] = int(os.environ.get('TY_DEMO_JOB_QUEUE_SIZE', 256))
+app.config['JOB_MAX_ATTEMPTS'] = 3
+app.config['JOB_RETRY_BACKOFF'] = 0.5
+app.config['JOB_RESULT_TTL'] = 300
+app.config['JOB_POLL_INTERVAL'] = '500ms'
+
+# Server-sent notification stream: idle heartbeat, connection lifetime
+# (browsers reconnect automatically), per-client buffer and client limit.
+# An open stream holds a worker thread, so with "auto" pages only stream
+# under gevent workers and otherwise poll every NOTIFICATION_POLL_INTERVAL.
+app.config['NOTIFICATION_TRANSPORT'] = os.environ.get('TY_DEMO_NOTIFICATION_TRANSPORT', 'auto')  # sse, poll, auto
+app.config['NOTIFICATION_POLL_INTERVAL'] = '5s'
+app.config['NOTIFICATION_STREAM_HEARTBEAT'] = 15
+app.config['NOTIFICATION_STREAM_MAX_AGE'] = 300
+app.config['NOTIFICATION_STREAM_BUFFER'] = 32
+app.config['NOTIFICATION_STREAM_MAX_CLIENTS'] = int(os.environ.get('TY_DEMO_SSE_MAX_CLIENTS', 100))
+
+# Task filter: results per page (``limit`` is clamped to the maximum)
+app.config['TASK_FILTER_PAGE_SIZE'] = 20
+app.config['TASK_FILTER_MAX_PAGE_SIZE'] = 100
+
+# Request metrics at /metrics (Prometheus text format): latency histogram
+# bounds in seconds and response size bounds in bytes
+app.config['METRICS_LATENCY_BUCKETS'] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                                         0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+app.config['METRICS_SIZE_BUCKETS'] = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# Logging: records from the ty_demo.* loggers go through a bounded queue
+# drained by a background thread, so handlers never write to stdout on the
+# request path (a full queue drops the record rather than blocking).
+# LOG_LEVELS overrides the level per logger and LOG_SAMPLING keeps only a
+# fraction of a logger's records below WARNING, e.g.
+#   TY_DEMO_LOG_LEVELS="ty_demo.tasks=DEBUG" TY_DEMO_LOG_SAMPLING="ty_demo.calendar=0.1"
+app.config['LOG_LEVEL'] = os.environ.get('TY_DEMO_LOG_LEVEL', 'INFO').upper()
+app.config['LOG_FORMAT'] = os.environ.get('TY_DEMO_LOG_FORMAT', 'json')  # "json" or "text"
+app.config['LOG_LEVELS'] = {name: level.upper() for name, _, level in (
+    item.partition("=") for item in os.environ.get('TY_DEMO_LOG_LEVELS', '').split(",") if item)}
+app.config['LOG_SAMPLING'] = {name: float(rate) for name, _, rate in (
+    item.partition("=") for item in os.environ.get('TY_DEMO_LOG_SAMPLING', '').split(",") if item)}
+app.config['LOG_QUEUE_SIZE'] = 10000
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per record, or a text line with ``key=value`` pairs.
+
+    Fields passed with ``extra=`` are included as-is in either format.
+    """
+
+    STANDARD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def __init__(self, json_lines=True):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record):
+        fields = {key: value for key, value in vars(record).items() if key not in self.STANDARD_ATTRS}
+        timestamp = datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds")
+        if self.json_lines:
+            entry = {"time": timestamp, "level": record.levelname, "logger": record.name,
+                     "message": record.getMessage(), **fields}
+            if record.exc_text:
+                entry["exception"] = record.exc_text
+            return json.dumps(entry, default=str)
+        line = f"{timestamp} {record.levelname} {record.name}: {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value!r}" for key, value in fields.items())
+        return line + "\n" + record.exc_text if record.exc_text else line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of each logger's records below WARNING.
+
+    ``rates`` maps logger names to the fraction kept; a logger without an
+    entry uses its nearest configured ancestor's rate, or keeps everything.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._resolved = {}
+        self.sampled_out = 0
+
+    def rate(self, name):
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+        probe = name
+        while probe not in self.rates and "." in probe:
+            probe = probe.rsplit(".", 1)[0]
+        rate = self._resolved[name] = self.rates.get(probe, 1.0)
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        if rate >= 1 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class LogQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped (and counted) when
+    the queue is full, and ``extra`` fields survive for the formatter."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge the message arguments and render any traceback now, while
+        # the objects they refer to are still current
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+logger = logging.getLogger("ty_demo")
+calendar_log = logger.getChild("calendar")
+events_log = logger.getChild("events")
+tasks_log = logger.getChild("tasks")
+forms_log = logger.getChild("forms")
+debug_log = logger.getChild("debug")
+
+
+def configure_logging(config):
+    """Send the ``ty_demo`` loggers through a queue drained by a listener thread."""
+    logger.setLevel(config['LOG_LEVEL'])
+    for name, level in config['LOG_LEVELS'].items():
+        logging.getLogger(name).setLevel(level)
+
+    handler = LogQueueHandler(queue.Queue(config['LOG_QUEUE_SIZE']))
+    handler.addFilter(SamplingFilter(config['LOG_SAMPLING']))
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(StructuredFormatter(json_lines=config['LOG_FORMAT'] == 'json'))
+    listener = QueueListener(handler.queue, output)
+    logger.addHandler(handler)
+    logger.propagate = False
+    listener.start()
+    atexit.register(listener.stop)  # Flush what is still queued on exit
+    return handler
+
+
+log_handler = configure_logging(app.config)
+
+# Month names for calendar functionality - FIXES month_names UndefinedError
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+
+# Global template context processor - ensures month_names is always available
+@app.context_processor
+def inject_global_vars():
+    """Inject global variables into all templates to prevent UndefinedError"""
+    current_date = datetime.now()
+    return {
+        'month_names': MONTH_NAMES,
+        'current_year': current_date.year,
+        'current_month': current_date.month,
+        'current_day': current_date.day,
+    }
+
+# Allowed values of the enum-like record fields
+USER_ROLES = ("Admin", "Editor", "User")
+TASK_STATUSES = ("pending", "in-progress", "completed")
+TASK_PRIORITIES = ("low", "medium", "high", "critical")  # Ascending rank
+
+
+def enum_value(value, allowed):
+    """Return ``value`` interned, so every record shares one string per value."""
+    if value not in allowed:
+        raise ValueError(f"{value!r} is not one of {', '.join(allowed)}")
+    return sys.intern(value)
+
+
+class User:
+    """A user record; slotted, since there is one per user in the table."""
+
+    __slots__ = ("id", "name", "email", "role")
+
+    def __init__(self, id, name, email, role):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = enum_value(role, USER_ROLES)
+
+
+class Task:
+    """A task record; slotted, since there is one per task in the table."""
+
+    __slots__ = ("id", "title", "priority", "_status")
+
+    def __init__(self, id, title, priority, status):
+        self.id = id
+        self.title = title
+        self.priority = enum_value(priority, TASK_PRIORITIES)
+        self.status = status
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        self._status = enum_value(value, TASK_STATUSES)
+
+
+# Sample data for demonstrations
+SAMPLE_USERS = [
+    User(1, "Alice Johnson", "alice@example.com", "Admin"),
+    User(2, "Bob Smith", "bob@example.com", "User"),
+    User(3, "Carol Williams", "carol@example.com", "Editor"),
+    User(4, "David Brown", "david@example.com", "User"),
+    User(5, "Eva Davis", "eva@example.com", "Admin"),
+]
+
+SAMPLE_TASKS = [
+    Task(1, "Design new homepage", "high", "in-progress"),
+    Task(2, "Fix login bug", "critical", "pending"),
+    Task(3, "Update documentation", "low", "completed"),
+    Task(4, "Optimize database queries", "medium", "pending"),
+]
+
+# Id indexes for constant-time lookups
+USERS_BY_ID = {user.id: user for user in SAMPLE_USERS}
+TASKS_BY_ID = {task.id: task for task in SAMPLE_TASKS}
+
+# Event type configuration
+EVENT_TYPES = {
+    "meeting": {"icon": "users", "color": "primary", "name": "Meeting"},
+    "deadline": {"icon": "calendar-x", "color": "danger", "name": "Deadline"}, 
+    "personal": {"icon": "user", "color": "info", "name": "Personal"},
+    "reminder": {"icon": "bell", "color": "warning", "name": "Reminder"}
+}
+
+# Templates for the generated demo events shown on the calendar
+GENERATED_EVENT_TYPES = [
+    {"title": "Team Meeting", "icon": "users", "color": "primary", "time": "10:00 AM"},
+    {"title": "Code Review", "icon": "code", "color": "info", "time": "2:00 PM"},
+    {"title": "Client Call", "icon": "phone", "color": "success", "time": "3:30 PM"},
+    {"title": "Project Deadline", "icon": "calendar-x", "color": "danger", "time": "11:59 PM"},
+    {"title": "Workshop", "icon": "book-open", "color": "warning", "time": "9:00 AM"},
+    {"title": "Planning Session", "icon": "target", "color": "secondary", "time": "1:00 PM"},
+]
+
+
+class EventStore:
+    """Thread-safe in-memory store for user-created calendar events.
+
+    Events are indexed by id (dict, O(1) lookup/delete) and by date
+    (insertion-ordered dict of ids per date plus a sorted list of dates
+    for O(log n) range scans). Id allocation has its own lock so handing
+    out ids never contends with index updates.
+    """
+
+    def __init__(self, first_id=1):
+        self._next_id = first_id
+        self._id_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._by_id = {}      # {event_id: event}
+        self._by_date = {}    # {"2025-01-15": {event_id: event, ...}}
+        self._dates = []      # sorted date strings that have events
+
+    def next_id(self):
+        """Atomically reserve the next event id."""
+        with self._id_lock:
+            event_id = self._next_id
+            self._next_id += 1
+            return event_id
+
+    def put(self, event):
+        """Store an event that already has an id (journal replay)."""
+        with self._id_lock:
+            self._next_id = max(self._next_id, event["id"] + 1)
+        self._insert(event)
+        return event
+
+    def _insert(self, event):
+        date_str = event["date"]
+        with self._lock:
+            self._by_id[event["id"]] = event
+            day = self._by_date.get(date_str)
+            if day is None:
+                day = self._by_date[date_str] = {}
+                bisect.insort(self._dates, date_str)
+            day[event["id"]] = event
+
+    def delete(self, event_id):
+        """Remove an event by id. Returns the removed event or None."""
+        with self._lock:
+            event = self._by_id.pop(event_id, None)
+            if event is None:
+                return None
+            date_str = event["date"]
+            day = self._by_date[date_str]
+            del day[event_id]
+            if not day:
+                del self._by_date[date_str]
+                del self._dates[bisect.bisect_left(self._dates, date_str)]
+            return event
+
+    def get(self, event_id):
+        return self._by_id.get(event_id)
+
+    def for_date(self, date_str):
+        """Events for a single date, in creation order."""
+        with self._lock:
+            day = self._by_date.get(date_str)
+            return list(day.values()) if day else []
+
+    def export(self):
+        """Snapshot of all events, ordered by date."""
+        with self._lock:
+            return [event for date_str in self._dates
+                    for event in self._by_date[date_str].values()]
+
+    def between(self, start, end):
+        """Events dated within [start, end] (ISO date strings), ordered by date."""
+        with self._lock:
+            lo = bisect.bisect_left(self._dates, start)
+            hi = bisect.bisect_right(self._dates, end)
+            return [event for date_str in self._dates[lo:hi]
+                    for event in self._by_date[date_str].values()]
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+class JournalError(RuntimeError):
+    """The journal can no longer make mutations durable."""
+
+
+class Journal:
+    """Append-only mutation log with group commit and compacted snapshots.
+
+    ``record()`` applies a mutation and enqueues its log line under one lock,
+    so the log order always matches the in-memory order. A single writer
+    thread drains the queue, writes every pending line and fsyncs once per
+    batch; callers block only until their record is durable. Every
+    ``snapshot_every`` records the writer starts a new log segment and writes
+    a snapshot, then drops older segments and snapshots, so startup replays
+    at most one snapshot plus a short tail.
+
+    If writing fails (e.g. a full disk) the writer stops and the error is
+    raised from every pending and later ``record()`` as a JournalError, so
+    no caller waits forever for durability that will not come.
+
+    The journal belongs to one process: ``open()`` takes an exclusive lock
+    on the directory and raises JournalError if another process holds it.
+    """
+
+    def __init__(self, directory, snapshot_every=1000, commit_interval=0.005):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.commit_interval = commit_interval
+        self._cond = threading.Condition()
+        self._pending = []
+        self._seq = 0
+        self._durable_seq = 0
+        self._snapshot_seq = 0
+        self._dump_state = None
+        self._segment = None
+        self._writer = None
+        self._error = None
+        self._closed = False
+        self._lock_file = None
+
+    def open(self, load_snapshot, replay, dump_state):
+        """Restore state from disk and start the writer thread.
+
+        ``load_snapshot(state)`` restores a snapshot, ``replay(op, data)``
+        re-applies one logged mutation and ``dump_state()`` returns the
+        JSON-serializable state for future snapshots. Returns True when
+        any persisted state was found.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock()
+        self._dump_state = dump_state
+        restored = False
+
+        for name in sorted(self._files("snapshot-"), reverse=True):
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue  # Half-written snapshot, fall back to an older one
+            load_snapshot(state)
+            self._seq = self._snapshot_seq = state["seq"]
+            restored = True
+            break
+
+        for name in sorted(self._files("journal-")):
+            with open(os.path.join(self.directory, name)) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn write at the end of a segment
+                    if entry["seq"] <= self._seq:
+                        continue
+                    replay(entry["op"], entry["data"])
+                    self._seq = entry["seq"]
+                    restored = True
+
+        self._durable_seq = self._seq
+        self._open_segment(self._seq + 1)
+        self._writer = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._writer.start()
+        return restored
+
+    def record(self, op, data, apply):
+        """Apply a mutation, log it and wait until the log entry is durable."""
+        if self._writer is None:
+            return apply()
+        with self._cond:
+            self._raise_if_failed()
+            result = apply()
+            self._seq += 1
+            seq = self._seq
+            self._pending.append(json.dumps({"seq": seq, "op": op, "data": data}) + "\n")
+            if seq - self._snapshot_seq >= self.snapshot_every:
+                self._snapshot_seq = seq
+                self._pending.append((seq, self._dump_state()))
+            self._cond.notify_all()
+            while self._durable_seq < seq:
+                self._raise_if_failed()
+                self._cond.wait()
+        return result
+
+    def _lock(self):
+        """Hold an exclusive lock on the directory for the life of the process.
+
+        Two processes sharing a journal would interleave sequence numbers and
+        delete each other's segments, so the second one refuses to start.
+        """
+        if fcntl is None:
+            return
+        lock_file = open(os.path.join(self.directory, "LOCK"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise JournalError(
+                f"Journal {self.directory} is in use by another process; the memory "
+                "backend runs in a single process, set TY_DEMO_STORAGE=sqlite to run "
+                "several workers") from None
+        self._lock_file = lock_file
+
+    def close(self):
+        """Make pending records durable, stop the writer and release the lock."""
+        if self._writer is not None:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._writer.join()
+            self._segment.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _raise_if_failed(self):
+        if self._closed:
+            raise JournalError("Journal is closed")
+        if self._error is not None:
+            raise JournalError(f"Journal writer failed: {self._error}") from self._error
+
+    def _files(self, prefix):
+        return [name for name in os.listdir(self.directory)
+                if name.startswith(prefix) and not name.endswith(".tmp")]
+
+    def _open_segment(self, first_seq):
+        path = os.path.join(self.directory, f"journal-{first_seq:012d}.log")
+        self._segment = open(path, "a", encoding="utf-8")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+            # Give concurrent writers a moment to join this batch
+            time.sleep(self.commit_interval)
+            with self._cond:
+                batch, self._pending = self._pending, []
+                last_seq = self._seq
+
+            try:
+                for item in batch:
+                    if isinstance(item, str):
+                        self._segment.write(item)
+                    else:
+                        self._write_snapshot(*item)
+                self._segment.flush()
+                os.fsync(self._segment.fileno())
+            except Exception as exc:
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+
+            with self._cond:
+                self._durable_seq = last_seq
+                self._cond.notify_all()
+
+    def _write_snapshot(self, seq, state):
+        # Records up to ``seq`` are in the current segment; make them durable,
+        # then start a fresh segment for everything after the snapshot
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self._segment.close()
+        self._open_segment(seq + 1)
+
+        name = f"snapshot-{seq:012d}.json"
+        tmp_path = os.path.join(self.directory, name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, **state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+        current_segment = os.path.basename(self._segment.name)
+        for old in self._files("snapshot-") + self._files("journal-"):
+            if old not in (name, current_segment):
+                os.remove(os.path.join(self.directory, old))
+
+
+def make_event_fields(title, date_str, event_type, time=None, created_at=None):
+    """Build the display fields for an event (everything except its id)."""
+    type_config = EVENT_TYPES.get(event_type, EVENT_TYPES["personal"])
+    date_obj = datetime.fromisoformat(date_str)
+    return {
+        "title": title,
+        "date": date_str,
+        "formatted_date": date_obj.strftime("%A, %B %d, %Y"),
+        "type": event_type,
+        "icon": type_config["icon"],
+        "color": type_config["color"],
+        "name": type_config["name"],
+        "time": time,
+        "created_at": created_at or datetime.now().isoformat()
+    }
+
+
+class MemoryStorage:
+    """Per-process storage: an EventStore plus lists, made durable by an optional Journal.
+
+    Every event mutation increments the data version and is appended to an
+    in-memory change log, trimmed to ``change_log_size`` entries and
+    ``change_retention`` seconds.
+    """
+
+    def __init__(self, journal=None, change_retention=3600, change_log_size=10000):
+        self.events = EventStore()
+        self.form_submissions = []
+        self.selected_dates = []
+        self.journal = journal
+        # Version of the event data; the epoch keeps it unique across restarts
+        self._epoch = os.urandom(4).hex()
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self.change_retention = change_retention
+        self._changes = deque(maxlen=change_log_size)  # (recorded_at, change)
+        self._replay = {
+            "event.create": self.events.put,
+            "event.delete": lambda data: self.events.delete(data["id"]),
+            "form.submit": self.form_submissions.append,
+            "date.select": self.selected_dates.append,
+        }
+
+    def open(self):
+        """Restore persisted state. Returns True when any state was found."""
+        if self.journal is None:
+            return False
+        return self.journal.open(self._load_state, self._replay_mutation, self._dump_state)
+
+    def close(self):
+        """Flush and release the journal, if any."""
+        if self.journal is not None:
+            self.journal.close()
+
+    def _record(self, op, data, apply):
+        if self.journal is None:
+            return apply()
+        return self.journal.record(op, data, apply)
+
+    def _log_change(self, op, event):
+        """Bump the data version and record the mutation under it."""
+        now = time.monotonic()
+        with self._version_lock:
+            self._version += 1
+            change = {"version": self._version, "op": op, "id": event["id"], "date": event["date"]}
+            if op == "create":
+                change["event"] = event
+            self._changes.append((now, change))
+            self._prune_changes(now)
+
+    def _prune_changes(self, now):
+        """Drop changes older than ``change_retention``; caller holds ``_version_lock``."""
+        while self._changes and self._changes[0][0] < now - self.change_retention:
+            self._changes.popleft()
+
+    def changes_since(self, since, limit):
+        """Change feed after version ``since``; see ``change_feed``."""
+        with self._version_lock:
+            # Prune here too, so retention holds while no writes come in
+            self._prune_changes(time.monotonic())
+            changes = []
+            if self._changes:
+                oldest = self._changes[0][1]["version"]
+                start = max(since - oldest + 1, 0)
+                changes = [change for _, change in itertools.islice(self._changes, start, start + limit)]
+                oldest_retained = oldest
+            else:
+                oldest_retained = self._version + 1
+            return change_feed(self._epoch, self._version, since, oldest_retained, changes, limit)
+
+    def data_version(self):
+        """Opaque token that changes whenever events are created or deleted."""
+        return f"{self._epoch}.{self._version}"
+
+    def create_event(self, fields):
+        """Persist a new event and return it."""
+        event = {"id": self.events.next_id(), **fields}
+        event = self._record("event.create", event, lambda: self.events.put(event))
+        self._log_change("create", event)
+        return event
+
+    def delete_event(self, event_id):
+        """Delete an event by id. Returns the removed event or None."""
+        event = self._record("event.delete", {"id": event_id},
+                             lambda: self.events.delete(event_id))
+        if event is not None:
+            self._log_change("delete", event)
+        return event
+
+    def events_for_date(self, date_str):
+        return self.events.for_date(date_str)
+
+    def events_between(self, start, end):
+        return self.events.between(start, end)
+
+    def add_form_submission(self, submission):
+        self._record("form.submit", submission,
+                     lambda: self.form_submissions.append(submission))
+
+    def add_selected_date(self, selection):
+        self._record("date.select", selection,
+                     lambda: self.selected_dates.append(selection))
+
+    def _dump_state(self):
+        """Serializable copy of all persisted state, for journal snapshots."""
+        return {
+            "events": self.events.export(),
+            "form_submissions": list(self.form_submissions),
+            "selected_dates": list(self.selected_dates),
+        }
+
+    def _load_state(self, state):
+        for event in state["events"]:
+            self.events.put(event)
+        self.form_submissions.extend(state["form_submissions"])
+        self.selected_dates.extend(state["selected_dates"])
+
+    def _replay_mutation(self, op, data):
+        self._replay[op](data)
+
+
+class SQLiteStorage:
+    """Storage in a local SQLite database (WAL mode) shared across processes.
+
+    Connections come from a bounded pool and go back after each operation,
+    so thread-per-request servers don't leave one behind per thread.
+    Statements are constant strings, so sqlite3's per-connection statement
+    cache prepares them once per pooled connection.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            title TEXT NOT NULL,
+            type TEXT NOT NULL,
+            time TEXT,
+            created_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS events_date_id ON events (date, id);
+        CREATE TABLE IF NOT EXISTS form_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT, email TEXT, age TEXT, role TEXT, skills TEXT,
+            timestamp TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS selected_dates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            formatted TEXT,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS selected_dates_date ON selected_dates (date);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS event_changes (
+            version INTEGER PRIMARY KEY,
+            op TEXT NOT NULL,
+            event_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            event TEXT,
+            recorded_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS event_changes_recorded_at ON event_changes (recorded_at);
+        CREATE TABLE IF NOT EXISTS results (
+            id TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at);
+    """
+
+    INSERT_EVENT = "INSERT INTO events (date, title, type, time, created_at) VALUES (?, ?, ?, ?, ?)"
+    SELECT_EVENT = "SELECT id, date, title, type, time, created_at FROM events WHERE id = ?"
+    DELETE_EVENT = "DELETE FROM events WHERE id = ?"
+    SELECT_EVENTS_FOR_DATE = ("SELECT id, date, title, type, time, created_at "
+                              "FROM events WHERE date = ? ORDER BY id")
+    SELECT_EVENTS_BETWEEN = ("SELECT id, date, title, type, time, created_at "
+                             "FROM events WHERE date BETWEEN ? AND ? ORDER BY date, id")
+    INSERT_FORM_SUBMISSION = ("INSERT INTO form_submissions (name, email, age, role, skills, timestamp) "
+                              "VALUES (:name, :email, :age, :role, :skills, :timestamp)")
+    INSERT_SELECTED_DATE = ("INSERT INTO selected_dates (date, formatted, timestamp) "
+                            "VALUES (:date, :formatted, :timestamp)")
+    BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'data_version'"
+    SELECT_VERSION = "SELECT value FROM meta WHERE key = 'data_version'"
+    # The change row takes the version just bumped in the same transaction
+    INSERT_CHANGE = ("INSERT INTO event_changes (version, op, event_id, date, event, recorded_at) "
+                     "SELECT CAST(value AS INTEGER), ?, ?, ?, ?, ? FROM meta WHERE key = 'data_version'")
+    COMPACT_CHANGES = "DELETE FROM event_changes WHERE recorded_at < ?"
+    SELECT_OLDEST_CHANGE = "SELECT min(version) FROM event_changes"
+    SELECT_CHANGES_SINCE = ("SELECT version, op, event_id, date, event FROM event_changes "
+                            "WHERE version > ? ORDER BY version LIMIT ?")
+    PUT_RESULT = "INSERT OR REPLACE INTO results (id, value, expires_at) VALUES (?, ?, ?)"
+    SELECT_RESULT = "SELECT value FROM results WHERE id = ? AND expires_at > ?"
+    EXPIRE_RESULTS = "DELETE FROM results WHERE expires_at <= ?"
+
+    def __init__(self, path, change_retention=3600, pool_size=8):
+        self.path = path
+        self.change_retention = change_retention
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._epoch = None
+
+    @contextmanager
+    def _connection(self):
+        """Check a connection out of the pool; opens a new one when it's empty.
+
+        Connections beyond ``pool_size`` are closed on return instead of kept.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                   cached_statements=64, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def open(self):
+        """Create the schema. Returns True if the database was already initialized."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+        # Claim initialization atomically so concurrent workers seed only once
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'initialized'").fetchone()
+            if row is None:
+                self._epoch = datetime.now().isoformat()
+                conn.execute("INSERT INTO meta (key, value) VALUES ('initialized', ?)", (self._epoch,))
+            else:
+                self._epoch = row[0]
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)")
+        return row is not None
+
+    def close(self):
+        """Close the idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def _transaction(self, mode="IMMEDIATE"):
+        with self._connection() as conn:
+            conn.execute(f"BEGIN {mode}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def data_version(self):
+        """Opaque token that changes whenever any worker creates or deletes an event."""
+        with self._connection() as conn:
+            version = conn.execute(self.SELECT_VERSION).fetchone()[0]
+        return f"{self._epoch}.{version}"
+
+    @staticmethod
+    def _row_to_event(row):
+        event_id, date_str, title, event_type, time_str, created_at = row
+        return {"id": event_id, **make_event_fields(title, date_str, event_type, time_str, created_at)}
+
+    def create_event(self, fields):
+        """Persist a new event and return it."""
+        with self._transaction() as conn:
+            cursor = conn.execute(self.INSERT_EVENT, (
+                fields["date"], fields["title"], fields["type"], fields["time"], fields["created_at"]))
+            event = {"id": cursor.lastrowid, **fields}
+            self._log_change(conn, "create", event)
+        return event
+
+    def delete_event(self, event_id):
+        """Delete an event by id. Returns the removed event or None."""
+        with self._transaction() as conn:
+            row = conn.execute(self.SELECT_EVENT, (event_id,)).fetchone()
+            if row is not None:
+                conn.execute(self.DELETE_EVENT, (event_id,))
+                self._log_change(conn, "delete", self._row_to_event(row))
+        return self._row_to_event(row) if row else None
+
+    def put_result(self, result_id, value, ttl):
+        """Store JSON-serializable ``value`` where every worker can read it for ``ttl`` seconds."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(self.PUT_RESULT, (result_id, json.dumps(value), now + ttl))
+            conn.execute(self.EXPIRE_RESULTS, (now,))
+
+    def get_result(self, result_id):
+        """The value stored by ``put_result``, or None if unknown or expired."""
+        with self._connection() as conn:
+            row = conn.execute(self.SELECT_RESULT, (result_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _log_change(self, conn, op, event):
+        """Bump the data version and record the mutation, inside the caller's transaction."""
+        now = time.time()
+        conn.execute(self.BUMP_VERSION)
+        conn.execute(self.INSERT_CHANGE, (op, event["id"], event["date"],
+                                          json.dumps(event) if op == "create" else None, now))
+        conn.execute(self.COMPACT_CHANGES, (now - self.change_retention,))
+
+    def changes_since(self, since, limit):
+        """Change feed after version ``since``; see ``change_feed``."""
+        # A read transaction gives the three queries one consistent snapshot
+        with self._transaction("DEFERRED") as conn:
+            version = int(conn.execute(self.SELECT_VERSION).fetchone()[0])
+            oldest = conn.execute(self.SELECT_OLDEST_CHANGE).fetchone()[0]
+            rows = conn.execute(self.SELECT_CHANGES_SINCE, (since, limit)).fetchall()
+        changes = []
+        for change_version, op, event_id, date_str, event in rows:
+            change = {"version": change_version, "op": op, "id": event_id, "date": date_str}
+            if event is not None:
+                change["event"] = json.loads(event)
+            changes.append(change)
+        return change_feed(self._epoch, version, since, version + 1 if oldest is None else oldest,
+                           changes, limit)
+
+    def events_for_date(self, date_str):
+        with self._connection() as conn:
+            rows = conn.execute(self.SELECT_EVENTS_FOR_DATE, (date_str,)).fetchall()
+        return [self._row_to_event(row) for row in rows]
+
+    def events_between(self, start, end):
+        with self._connection() as conn:
+            rows = conn.execute(self.SELECT_EVENTS_BETWEEN, (start, end)).fetchall()
+        return [self._row_to_event(row) for row in rows]
+
+    def add_form_submission(self, submission):
+        with self._connection() as conn:
+            conn.execute(self.INSERT_FORM_SUBMISSION, submission)
+
+    def add_selected_date(self, selection):
+        with self._connection() as conn:
+            conn.execute(self.INSERT_SELECTED_DATE, selection)
+
+
+def change_feed(epoch, version, since, oldest_retained, changes, limit):
+    """Payload of /api/calendar/changes.
+
+    Versions are contiguous, so the log covers every change after
+    ``oldest_retained - 1``. A client further behind than that (or ahead of
+    ``version``, i.e. from before a restart) gets ``reset`` and must reload
+    instead of applying deltas. With ``more`` set, ``version`` is that of
+    the last change returned and the client should ask again right away.
+    """
+    if since > version or since < oldest_retained - 1:
+        return {"epoch": epoch, "version": version, "reset": True, "more": False, "changes": []}
+    more = len(changes) == limit and changes[-1]["version"] < version
+    return {"epoch": epoch, "version": changes[-1]["version"] if more else version,
+            "reset": False, "more": more, "changes": changes}
+
+
+# Event scheduler storage
+if app.config['STORAGE_BACKEND'] == 'sqlite':
+    storage = SQLiteStorage(app.config['SQLITE_PATH'], app.config['CHANGE_LOG_RETENTION'],
+                            app.config['SQLITE_POOL_SIZE'])
+else:
+    storage = MemoryStorage(
+        Journal(
+            app.config['JOURNAL_DIR'],
+            snapshot_every=app.config['JOURNAL_SNAPSHOT_EVERY'],
+            commit_interval=app.config['JOURNAL_COMMIT_INTERVAL'],
+        ) if app.config['JOURNAL_ENABLED'] else None,
+        change_retention=app.config['CHANGE_LOG_RETENTION'],
+        change_log_size=app.config['CHANGE_LOG_MAX_ENTRIES'],
+    )
+
+# Where deferred results and job statuses are published so that a poll
+# landing on any worker finds them; the memory backend runs one process
+result_store = storage if isinstance(storage, SQLiteStorage) else None
+
+# Add some demo events to show persistence
+def initialize_demo_events():
+    """Add some sample events to demonstrate persistence."""
+    demo_events = [
+        {
+            "date": "2025-01-15",
+            "title": "Team Standup",
+            "type": "meeting",
+            "time": "9:00 AM"
+        },
+        {
+            "date": "2025-01-15", 
+            "title": "Project Deadline",
+            "type": "deadline",
+            "time": "5:00 PM"
+        },
+        {
+            "date": "2025-01-20",
+            "title": "Doctor Appointment", 
+            "type": "personal",
+            "time": "2:00 PM"
+        },
+        {
+            "date": "2025-01-20",
+            "title": "Call Mom",
+            "type": "reminder",
+            "time": "7:00 PM"
+        }
+    ]
+    
+    for demo_event in demo_events:
+        storage.create_event(make_event_fields(
+            demo_event["title"],
+            demo_event["date"],
+            demo_event["type"],
+            demo_event.get("time"),
+        ))
+
+# Restore persisted state, seeding demo events only on a fresh start
+if not storage.open():
+    initialize_demo_events()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with hit/miss/eviction counters.
+
+    ``maxsize`` bounds the number of entries; ``max_bytes`` optionally also
+    bounds the total ``sizeof()`` (default ``len()``) of the cached values.
+    With ``ttl`` (seconds) entries also expire that long after being set.
+    """
+
+    def __init__(self, name, maxsize, max_bytes=None, sizeof=len, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._expires = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None and self._expires[key] <= time.monotonic():
+                self._pop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _pop(self, key):
+        value = self._data.pop(key)
+        self._expires.pop(key, None)
+        if self.max_bytes is not None:
+            self.bytes -= self.sizeof(value)
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            if self.max_bytes is not None:
+                size = self.sizeof(value)
+                if size > self.max_bytes:
+                    return  # Would evict everything else; not worth caching
+                old = self._data.get(key)
+                self.bytes += size - (self.sizeof(old) if old is not None else 0)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize or (
+                    self.max_bytes is not None and self.bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def discard_where(self, predicate):
+        """Drop every entry whose key satisfies ``predicate``."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                self._pop(key)
+            self.invalidations += len(stale)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+            if self.max_bytes is not None:
+                stats.update(bytes=self.bytes, max_bytes=self.max_bytes)
+            if self.ttl is not None:
+                stats.update(ttl=self.ttl, expirations=self.expirations)
+            return stats
+
+
+# Every cache reported by /api/cache-status
+CACHES = {}
+
+
+def register_cache(cache):
+    CACHES[cache.name] = cache
+    return cache
+
+
+month_events_cache = register_cache(
+    LRUCache("month_events", app.config['MONTH_EVENTS_CACHE_SIZE']))
+
+
+class Histogram:
+    """Counts per fixed bucket (the last one is +Inf) plus the sum of values."""
+
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+
+class MetricsShard:
+    """One thread's request counters; only that thread ever writes to them."""
+
+    __slots__ = ("latency", "sizes", "responses", "inflight")
+
+    def __init__(self):
+        self.latency = {}    # (endpoint, phase) -> Histogram of seconds
+        self.sizes = {}      # endpoint -> Histogram of response bytes
+        self.responses = {}  # (endpoint, status) -> count
+        self.inflight = {}   # endpoint -> requests started minus finished
+
+
+class RequestMetrics:
+    """Per-endpoint latency histograms, response sizes and in-flight counts.
+
+    Each thread records into its own MetricsShard (a ``threading.local``),
+    so the request path takes no lock. When a thread exits its shard is
+    folded into a "retired" aggregate, so servers that start a thread per
+    request (Werkzeug's) keep only one shard per live thread. ``snapshot()``
+    merges the retired aggregate and the live shards at scrape time.
+    Request time is split into "render" (Jinja), "compress" (the body
+    actually being compressed, or served from the compressed-response
+    cache) and "handler" (everything else), which add up to "total";
+    render and compress are only observed when they happened.
+    """
+
+    def __init__(self, latency_buckets, size_buckets):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._local = threading.local()
+        self._shards = set()
+        self._retired = MetricsShard()
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = MetricsShard()
+            with self._lock:
+                self._shards.add(shard)
+            weakref.finalize(threading.current_thread(), self._retire, shard)
+            return shard
+
+    def _retire(self, shard):
+        """Fold the shard of an exited thread into the retired aggregate."""
+        with self._lock:
+            self._shards.discard(shard)
+            self._merge(self._retired, shard)
+
+    @staticmethod
+    def _merge(target, shard):
+        for merged, histograms in ((target.latency, shard.latency), (target.sizes, shard.sizes)):
+            for key, histogram in histograms.copy().items():
+                total = merged.setdefault(key, Histogram(()))
+                counts = list(histogram.counts)
+                total.counts = [a + b for a, b in itertools.zip_longest(total.counts, counts, fillvalue=0)]
+                total.sum += histogram.sum
+        for merged, counters in ((target.responses, shard.responses), (target.inflight, shard.inflight)):
+            for key, count in counters.copy().items():
+                merged[key] = merged.get(key, 0) + count
+
+    def request_started(self, endpoint):
+        inflight = self._shard().inflight
+        inflight[endpoint] = inflight.get(endpoint, 0) + 1
+
+    def request_finished(self, endpoint):
+        inflight = self._shard().inflight
+        inflight[endpoint] -= 1
+
+    def add_time(self, phase, seconds):
+        """Credit ``seconds`` of the current request to ``phase``."""
+        phases = g.setdefault("_metrics_phases", {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def _observe(self, histograms, key, buckets, value):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(buckets)
+        histogram.counts[bisect.bisect_left(buckets, value)] += 1
+        histogram.sum += value
+
+    def observe(self, endpoint, status, total, phases, size):
+        shard = self._shard()
+        render = phases.get("render", 0.0)
+        compress = phases.get("compress", 0.0)
+        buckets = self.latency_buckets
+        self._observe(shard.latency, (endpoint, "total"), buckets, total)
+        self._observe(shard.latency, (endpoint, "handler"), buckets, max(total - render - compress, 0.0))
+        if render:
+            self._observe(shard.latency, (endpoint, "render"), buckets, render)
+        if compress:
+            self._observe(shard.latency, (endpoint, "compress"), buckets, compress)
+        if size is not None:
+            self._observe(shard.sizes, endpoint, self.size_buckets, size)
+        key = (endpoint, status)
+        shard.responses[key] = shard.responses.get(key, 0) + 1
+
+    def snapshot(self):
+        """Every shard's counters merged; dict copies are atomic under the GIL.
+
+        Holds the lock throughout so a shard retiring mid-scrape is counted
+        exactly once.
+        """
+        total = MetricsShard()
+        with self._lock:
+            self._merge(total, self._retired)
+            for shard in self._shards:
+                self._merge(total, shard)
+        return {"latency": total.latency, "sizes": total.sizes,
+                "responses": total.responses, "inflight": total.inflight}
+
+
+def histogram_quantile(q, buckets, counts):
+    """Estimate quantile ``q`` by interpolating within its bucket, as Prometheus does."""
+    count = sum(counts)
+    if not count:
+        return None
+    rank = q * count
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+        if cumulative + bucket_count >= rank and bucket_count:
+            if index == len(buckets):
+                return buckets[-1]  # In the +Inf bucket: the highest finite bound
+            lower = buckets[index - 1] if index else 0.0
+            return lower + (buckets[index] - lower) * (rank - cumulative) / bucket_count
+        cumulative += bucket_count
+    return buckets[-1]
+
+
+request_metrics = RequestMetrics(app.config['METRICS_LATENCY_BUCKETS'], app.config['METRICS_SIZE_BUCKETS'])
+
+# Requests currently being handled by this process
+inflight_requests = 0
+inflight_lock = threading.Lock()
+
+
+@app.before_request
+def track_request_start():
+    global inflight_requests
+    with inflight_lock:
+        inflight_requests += 1
+    g._metrics_started = time.perf_counter()
+    request_metrics.request_started(request.endpoint or "<none>")
+
+
+# Registered before Flask-Compress's hook, so it runs after it and sees the
+# compressed size and the compression time
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("_metrics_started")
+    if started is not None:
+        request_metrics.observe(request.endpoint or "<none>", response.status_code,
+                                time.perf_counter() - started, g.get("_metrics_phases", {}),
+                                None if response.is_streamed else response.content_length)
+    return response
+
+
+@app.teardown_request
+def track_request_end(exc):
+    global inflight_requests
+    with inflight_lock:
+        inflight_requests -= 1
+    if "_metrics_started" in g:
+        request_metrics.request_finished(request.endpoint or "<none>")
+
+
+def _render_started(sender, template, context, **extra):
+    g._render_depth = depth = g.get("_render_depth", 0) + 1
+    if depth == 1:
+        g._render_started = time.perf_counter()
+
+
+def _render_finished(sender, template, context, **extra):
+    g._render_depth -= 1
+    if not g._render_depth:
+        request_metrics.add_time("render", time.perf_counter() - g._render_started)
+
+
+before_render_template.connect(_render_started, app)
+template_rendered.connect(_render_finished, app)
+
+
+class CompressionCounters:
+    """Bytes in/out, CPU time and skip counts, bucketed by some key."""
+
+    def __init__(self):
+        self._buckets = {}
+
+    def add(self, key, bytes_in, bytes_out, seconds=0.0, skipped=False):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = {
+                "responses": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0, "cpu_seconds": 0.0}
+        bucket["responses"] += 1
+        bucket["skipped"] += skipped
+        bucket["bytes_in"] += bytes_in
+        bucket["bytes_out"] += bytes_out
+        bucket["cpu_seconds"] += seconds
+
+    def snapshot(self):
+        return {
+            key: {**bucket,
+                  "cpu_seconds": round(bucket["cpu_seconds"], 6),
+                  "ratio": round(bucket["bytes_out"] / bucket["bytes_in"], 4) if bucket["bytes_in"] else None}
+            for key, bucket in sorted(self._buckets.items())
+        }
+
+
+class CachingCompress(Compress):
+    """Flask-Compress that compresses each distinct body only once, adapts
+    its level to load and records what compression actually costs.
+
+    Compressed output is cached by (SHA-1 of the body, algorithm, level);
+    hashing is far cheaper than gzip/brotli, so repeated identical bodies
+    (static-ish pages, error pages, deterministic JSON) skip compression.
+    The CPU time originally spent on a cached body is credited to
+    ``saved_seconds`` on every hit.
+
+    With ``COMPRESS_ADAPTIVE`` the level follows the number of in-flight
+    requests, and endpoints whose output barely shrinks are sent
+    uncompressed (with an occasional probe so the ratio stays current).
+    Bytes in/out and CPU time are counted per mimetype and per endpoint.
+    """
+
+    def __init__(self, app=None, cache=None):
+        self.response_cache = cache
+        self.compress_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.by_mimetype = CompressionCounters()
+        self.by_endpoint = CompressionCounters()
+        self.level_choices = {}
+        # (endpoint, mimetype) -> moving average of compressed/original size
+        self._ratios = {}
+        self._skips = 0
+        self._stats_lock = threading.Lock()
+        super().__init__(app)
+
+    def _record(self, response, bytes_in, bytes_out, seconds=0.0, skipped=False):
+        endpoint = request.endpoint or "<none>"
+        with self._stats_lock:
+            self.by_mimetype.add(response.mimetype, bytes_in, bytes_out, seconds, skipped)
+            self.by_endpoint.add(endpoint, bytes_in, bytes_out, seconds, skipped)
+            if not skipped and bytes_in:
+                key = (endpoint, response.mimetype)
+                ratio = bytes_out / bytes_in
+                previous = self._ratios.get(key)
+                self._ratios[key] = ratio if previous is None else 0.8 * previous + 0.2 * ratio
+
+    def _compresses_poorly(self, app, response):
+        ratio = self._ratios.get((request.endpoint or "<none>", response.mimetype))
+        if ratio is None or ratio < app.config['COMPRESS_ADAPTIVE_SKIP_RATIO']:
+            return False
+        with self._stats_lock:
+            self._skips += 1
+            return self._skips % app.config['COMPRESS_ADAPTIVE_PROBE_EVERY'] != 0
+
+    def after_request(self, response):
+        app = current_app
+        if (app.config['COMPRESS_ADAPTIVE']
+                and not response.is_streamed
+                and 200 <= response.status_code < 300
+                and "Content-Encoding" not in response.headers
+                and self._compresses_poorly(app, response)):
+            response.vary.add("Accept-Encoding")
+            size = response.content_length or 0
+            self._record(response, size, size, skipped=True)
+            return response
+        return super().after_request(response)
+
+    def choose_level(self, app, algorithm):
+        """Compression level for ``algorithm`` given the current load."""
+        level = app.config['COMPRESS_BR_LEVEL'] if algorithm == 'br' else app.config['COMPRESS_LEVEL']
+        if app.config['COMPRESS_ADAPTIVE'] and algorithm in app.config['COMPRESS_ADAPTIVE_LEVELS']:
+            lowest, highest = app.config['COMPRESS_ADAPTIVE_LEVELS'][algorithm]
+            if inflight_requests >= app.config['COMPRESS_ADAPTIVE_SATURATED']:
+                level = lowest
+            elif inflight_requests <= app.config['COMPRESS_ADAPTIVE_IDLE']:
+                level = highest
+        with self._stats_lock:
+            choice = f"{algorithm}:{level}"
+            self.level_choices[choice] = self.level_choices.get(choice, 0) + 1
+        return level
+
+    def compress(self, app, response, algorithm):
+        started = time.perf_counter()
+        try:
+            return self._compress(app, response, algorithm)
+        finally:
+            request_metrics.add_time("compress", time.perf_counter() - started)
+
+    def _compress(self, app, response, algorithm):
+        data = response.get_data()
+        level = self.choose_level(app, algorithm)
+        key = (hashlib.sha1(data).digest(), algorithm, level)
+
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            compressed, seconds = cached
+            with self._stats_lock:
+                self.saved_seconds += seconds
+            self._record(response, len(data), len(compressed))
+            return compressed
+
+        started = time.perf_counter()
+        if algorithm == 'gzip':
+            compressed = gzip.compress(data, level, mtime=0)
+        elif algorithm == 'br':
+            compressed = brotli.compress(data, mode=app.config['COMPRESS_BR_MODE'], quality=level,
+                                         lgwin=app.config['COMPRESS_BR_WINDOW'],
+                                         lgblock=app.config['COMPRESS_BR_BLOCK'])
+        else:
+            compressed = zlib.compress(data, app.config['COMPRESS_DEFLATE_LEVEL'])
+        seconds = time.perf_counter() - started
+        with self._stats_lock:
+            self.compress_seconds += seconds
+        self._record(response, len(data), len(compressed), seconds)
+        self.response_cache.set(key, (compressed, seconds))
+        return compressed
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                **self.response_cache.stats(),
+                "compress_cpu_seconds": round(self.compress_seconds, 6),
+                "saved_cpu_seconds": round(self.saved_seconds, 6),
+            }
+
+    def telemetry(self):
+        with self._stats_lock:
+            return {
+                "by_mimetype": self.by_mimetype.snapshot(),
+                "by_endpoint": self.by_endpoint.snapshot(),
+                "level_choices": dict(sorted(self.level_choices.items())),
+                "poorly_compressing": sorted(
+                    f"{endpoint} ({mimetype})" for (endpoint, mimetype), ratio in self._ratios.items()
+                    if ratio >= current_app.config['COMPRESS_ADAPTIVE_SKIP_RATIO']),
+            }
+
+
+compressed_response_cache = register_cache(LRUCache(
+    "compressed_responses", app.config['COMPRESS_RESPONSE_CACHE_SIZE'],
+    max_bytes=app.config['COMPRESS_RESPONSE_CACHE_MAX_BYTES'],
+    sizeof=lambda entry: len(entry[0])))
+
+# Configure gzip compression
+compress = CachingCompress(cache=compressed_response_cache)
+compress.init_app(app)
+
+
+fragment_cache = register_cache(LRUCache(
+    "fragments", app.config['FRAGMENT_CACHE_SIZE'], max_bytes=app.config['FRAGMENT_CACHE_MAX_BYTES']))
+
+# Results of hot typeahead/filter queries, keyed by (kind, data version,
+# normalized parameters...). The version makes stale results unreachable;
+# mutations also discard them eagerly so they don't wait for the TTL.
+query_cache = register_cache(LRUCache(
+    "queries", app.config['QUERY_CACHE_SIZE'], ttl=app.config['QUERY_CACHE_TTL']))
+
+# Version of SAMPLE_TASKS; bumped on every task mutation
+tasks_version = 0
+tasks_version_lock = threading.Lock()
+
+
+def bump_tasks_version():
+    global tasks_version
+    with tasks_version_lock:
+        tasks_version += 1
+    query_cache.discard_where(lambda key: key[0] == "tasks")
+
+
+def render_fragment(template_name, key, version, context):
+    """Render an HTMX partial through the fragment cache.
+
+    ``key`` identifies the template arguments and ``version`` the data they
+    were read from, so mutations invalidate by bumping the version - stale
+    entries simply age out of the LRU. ``context`` is a callable returning
+    the template context; it (and Jinja) only run on a miss. Read
+    ``version`` before the data so a concurrent mutation can only make a
+    cached fragment newer, never older, than its key.
+    """
+    return fragment_cache.get_or_compute(
+        (template_name, key, version),
+        lambda: render_template(template_name, **context()))
+
+
+def render_event_list(date_str, formatted_date):
+    """Render the event list partial for one date, cached per storage data version."""
+    def context():
+        events = storage.events_for_date(date_str)
+        events_log.debug("Found events for date", extra={"date": date_str, "count": len(events)})
+        return {"events": events, "selected_date": formatted_date}
+
+    return render_fragment("partials/event_list.html", date_str, storage.data_version(), context)
+
+
+def etag_matches(etag):
+    """True if the request's If-None-Match contains ``etag``.
+
+    Flask-Compress appends ``:gzip``/``:br`` to ETags of compressed responses,
+    so the encoding suffix is ignored when comparing. If-None-Match uses
+    weak comparison (RFC 9110 13.1.2), so weak validators - e.g. an ETag a
+    proxy weakened when it re-compressed the body - match too.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return True
+    return any(tag.split(":", 1)[0] == etag for tag in if_none_match.as_set(include_weak=True))
+
+
+def conditional_response(key, build, data_version=None):
+    """Serve ``build()`` with a strong ETag derived from ``key``, or a bare 304.
+
+    ``key`` must capture every input of the response. Responses that also
+    depend on stored events pass ``data_version`` so the ETag changes on
+    every mutation; they are marked ``no-cache`` (always revalidate), while
+    purely input-derived responses may be reused for CALENDAR_CACHE_MAX_AGE.
+    """
+    etag = hashlib.sha1(repr((key, data_version)).encode()).hexdigest()
+    if data_version is None:
+        cache_control = f"public, max-age={app.config['CALENDAR_CACHE_MAX_AGE']}"
+    else:
+        cache_control = "no-cache"
+
+    if etag_matches(etag):
+        response = app.response_class(status=304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+class DeferredResults:
+    """Slow handler work run on a dedicated I/O thread pool.
+
+    ``submit()`` returns an id immediately, so the request thread is free
+    while the work waits on (simulated) upstream I/O; the client fetches
+    the result from ``/api/deferred/<id>``. Results not collected within
+    ``ttl`` seconds are dropped.
+
+    With a ``store`` (the SQLite backend) the state of each result is also
+    published there, so a poll that lands on another worker process still
+    finds it.
+    """
+
+    def __init__(self, max_workers, ttl, store=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="io")
+        self.ttl = ttl
+        self.store = store
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        deferred_id = secrets.token_urlsafe(12)
+        if self.store is not None:
+            self.store.put_result(f"deferred:{deferred_id}", {"status": "pending"}, self.ttl)
+        future = self.executor.submit(fn, *args)
+        if self.store is not None:
+            future.add_done_callback(lambda done: self._publish(deferred_id, done))
+        now = time.monotonic()
+        with self._lock:
+            for stale_id in [key for key, (_, expires) in self._futures.items() if expires <= now]:
+                del self._futures[stale_id]
+            self._futures[deferred_id] = (future, now + self.ttl)
+        return deferred_id
+
+    def _publish(self, deferred_id, future):
+        try:
+            result = future.result()
+            value = {"status": "done", "result": list(result) if isinstance(result, tuple) else result}
+        except Exception as e:
+            value = {"status": "error", "error": str(e)}
+        self.store.put_result(f"deferred:{deferred_id}", value, self.ttl)
+
+    def poll(self, deferred_id):
+        """The future for ``deferred_id`` (forgotten once done), or None if unknown."""
+        with self._lock:
+            entry = self._futures.get(deferred_id)
+            if entry is not None:
+                if entry[0].done():
+                    del self._futures[deferred_id]
+                return entry[0]
+        if self.store is None:
+            return None
+        # Started by another worker: rebuild its future from the shared state
+        value = self.store.get_result(f"deferred:{deferred_id}")
+        if value is None:
+            return None
+        future = Future()
+        if value["status"] == "done":
+            result = value["result"]
+            future.set_result(tuple(result) if isinstance(result, list) else result)
+        elif value["status"] == "error":
+            future.set_exception(RuntimeError(value["error"]))
+        return future
+
+
+deferred_results = DeferredResults(app.config['IO_EXECUTOR_WORKERS'], app.config['DEFERRED_RESULT_TTL'],
+                                   store=result_store)
+
+
+def render_deferred_placeholder(deferred_id, message):
+    return render_template("partials/deferred_placeholder.html", deferred_id=deferred_id,
+                           poll_interval=app.config['DEFERRED_POLL_INTERVAL'], message=message)
+
+
+def deferred_response(message, fn, *args):
+    """Run ``fn(*args)`` on the I/O pool and answer with a polling placeholder.
+
+    ``fn`` returns a view result (HTML, optionally with a status) and must
+    not touch ``request`` - read what it needs here and pass it in.
+    """
+    return render_deferred_placeholder(deferred_results.submit(fn, *args), message)
+
+
+class UpstreamCache:
+    """Stale-while-revalidate cache for slow upstream lookups.
+
+    A value is served as-is for ``ttl`` seconds, then for ``stale_ttl`` more
+    seconds while a single background refresh replaces it on ``executor``.
+    Concurrent misses for one key wait on the same in-flight fetch
+    (singleflight), so a burst of requests costs one upstream call. Failed
+    fetches are not cached; a failed refresh keeps serving the stale value.
+    """
+
+    def __init__(self, name, executor):
+        self.name = name
+        self.executor = executor
+        self._entries = {}   # key -> (value, fresh_until, stale_until)
+        self._inflight = {}  # key -> Future of the running fetch
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def get(self, key, fetch, ttl, stale_ttl, wait=True):
+        """The value for ``key``, calling ``fetch()`` at most once concurrently.
+
+        With ``wait=False`` a miss returns None instead of blocking, so the
+        caller can defer the slow path and answer cached hits inline.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[2]:
+                if now < entry[1]:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        self.refreshes += 1
+                        future = self._inflight[key] = Future()
+                        self.executor.submit(self._load, key, fetch, ttl, stale_ttl, future)
+                return entry[0]
+            if not wait:
+                return None
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                self.misses += 1
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if leader:
+            self._load(key, fetch, ttl, stale_ttl, future)
+        return future.result()
+
+    def _load(self, key, fetch, ttl, stale_ttl, future):
+        try:
+            value = fetch()
+        except Exception as exc:
+            with self._lock:
+                self.errors += 1
+                del self._inflight[key]
+            future.set_exception(exc)
+            return
+        fresh_until = time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (value, fresh_until, fresh_until + stale_ttl)
+            del self._inflight[key]
+        future.set_result(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "in_flight": len(self._inflight),
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            }
+
+
+upstream_cache = register_cache(UpstreamCache("upstream", deferred_results.executor))
+
+
+def upstream(name, fetch, key=None, wait=True):
+    """Look ``key`` (default ``name``) up through ``upstream_cache`` with ``name``'s policy."""
+    ttl, stale_ttl = app.config['UPSTREAM_CACHE_POLICIES'][name]
+    return upstream_cache.get(name if key is None else key, fetch, ttl, stale_ttl, wait=wait)
+
+
+class Job:
+    """One background job and, once finished, its result."""
+
+    def __init__(self, job_id, fn, args):
+        self.id = job_id
+        self.fn = fn
+        self.args = args
+        self.status = "queued"
+        self.attempts = 0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+
+class JobQueue:
+    """In-process background job runner.
+
+    Jobs wait in a bounded queue (``submit`` raises ``queue.Full`` when it
+    is full) and run on ``workers`` daemon threads. A job that raises is
+    retried up to ``max_attempts`` times, waiting ``backoff`` seconds
+    before the first retry and doubling each time. Finished jobs are kept
+    for ``result_ttl`` seconds so clients can collect the result. With a
+    ``store`` every status change is also published there, so any worker
+    process can answer a status poll.
+    """
+
+    def __init__(self, workers, maxsize, max_attempts, backoff, result_ttl, store=None):
+        self.store = store
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.counters = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0, "retries": 0}
+        # Recent (queue wait, total latency) pairs of finished jobs
+        self._latencies = deque(maxlen=1000)
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True).start()
+
+    def submit(self, fn, *args):
+        job = Job(secrets.token_urlsafe(12), fn, args)
+        with self._lock:
+            self._expire()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.counters["rejected"] += 1
+                raise
+            self._jobs[job.id] = job
+            self.counters["submitted"] += 1
+        self._publish(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            # Submitted to another worker: rebuild its status from the store
+            snapshot = self.store.get_result(f"job:{job_id}")
+            if snapshot is not None:
+                job = Job(job_id, None, ())
+                job.status, job.attempts = snapshot["status"], snapshot["attempts"]
+                job.result, job.error = snapshot["result"], snapshot["error"]
+        return job
 
-app = Flask(__name__)
-app.secret_key = "demo-key-change-in-production"
+    def _publish(self, job):
+        if self.store is None:
+            return
+        try:
+            self.store.put_result(f"job:{job.id}", {
+                "status": job.status, "attempts": job.attempts, "result": job.result, "error": job.error,
+            }, self.result_ttl)
+        except sqlite3.Error:
+            # Polls on other workers miss this update; never kill a worker over it
+            logger.warning("Could not publish job status", extra={"job_id": job.id}, exc_info=True)
 
-# Configure gzip compression
-compress = Compress()
-compress.init_app(app)
+    def _expire(self):
+        cutoff = time.monotonic() - self.result_ttl
+        for job_id in [job.id for job in self._jobs.values()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self._jobs[job_id]
 
-# Compression configuration
-app.config['COMPRESS_MIMETYPES'] = [
-    'text/html', 'text/css', 'text/xml',
-    'application/json', 'application/javascript',
-    'application/xml+rss', 'application/atom+xml',
-    'text/javascript', 'image/svg+xml'
-]
-app.config['COMPRESS_LEVEL'] = 6
-app.config['COMPRESS_MIN_SIZE'] = 500
+    def _retry(self, job):
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._finish(job, "failed", error="Job queue is full")
 
-# Month names for calendar functionality - FIXES month_names UndefinedError
-MONTH_NAMES = [
-    'January', 'February', 'March', 'April', 'May', 'June',
-    'July', 'August', 'September', 'October', 'November', 'December'
-]
+    def _finish(self, job, status, result=None, error=None):
+        with self._lock:
+            job.result, job.error = result, error
+            job.finished_at = time.monotonic()
+            job.status = status
+            self.counters["succeeded" if status == "done" else "failed"] += 1
+            self._latencies.append((job.started_at - job.submitted_at, job.finished_at - job.submitted_at))
+        self._publish(job)
 
-# Global template context processor - ensures month_names is always available
-@app.context_processor
-def inject_global_vars():
-    """Inject global variables into all templates to prevent UndefinedError"""
-    current_date = datetime.now()
-    return {
-        'month_names': MONTH_NAMES,
-        'current_year': current_date.year,
-        'current_month': current_date.month,
-        'current_day': current_date.day,
-    }
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            job.attempts += 1
+            if job.attempts == 1:
+                job.started_at = time.monotonic()
+            job.status = "running"
+            self._publish(job)
+            try:
+                result = job.fn(*job.args)
+            except Exception as e:
+                if job.attempts < self.max_attempts:
+                    job.status = "retrying"
+                    self._publish(job)
+                    with self._lock:
+                        self.counters["retries"] += 1
+                    delay = self.backoff * 2 ** (job.attempts - 1)
+                    threading.Timer(delay, self._retry, (job,)).start()
+                else:
+                    self._finish(job, "failed", error=str(e))
+            else:
+                self._finish(job, "done", result=result)
 
-# Sample data for demonstrations
-SAMPLE_USERS = [
-    {"id": 1, "name": "Alice Johnson", "email": "alice@example.com", "role": "Admin"},
-    {"id": 2, "name": "Bob Smith", "email": "bob@example.com", "role": "User"},
-    {"id": 3, "name": "Carol Williams", "email": "carol@example.com", "role": "Editor"},
-    {"id": 4, "name": "David Brown", "email": "david@example.com", "role": "User"},
-    {"id": 5, "name": "Eva Davis", "email": "eva@example.com", "role": "Admin"},
-]
+    def stats(self):
+        with self._lock:
+            waits = sorted(wait for wait, _ in self._latencies)
+            totals = sorted(total for _, total in self._latencies)
+            return {
+                **self.counters,
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "tracked_jobs": len(self._jobs),
+                "queue_wait_seconds": percentiles(waits),
+                "latency_seconds": percentiles(totals),
+            }
 
-SAMPLE_TASKS = [
-    {
-        "id": 1,
-        "title": "Design new homepage",
-        "priority": "high",
-        "status": "in-progress",
-    },
-    {"id": 2, "title": "Fix login bug", "priority": "critical", "status": "pending"},
-    {
-        "id": 3,
-        "title": "Update documentation",
-        "priority": "low",
-        "status": "completed",
-    },
-    {
-        "id": 4,
-        "title": "Optimize database queries",
-        "priority": "medium",
-        "status": "pending",
-    },
-]
 
-# In-memory storage for demo (use a real database in production)
-form_submissions = []
-selected_dates = []
+def percentiles(sorted_values):
+    """p50/p95/max of an ascending list (None when empty)."""
+    if not sorted_values:
+        return None
+    def pick(q):
+        return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 6)
+    return {"p50": pick(0.5), "p95": pick(0.95), "max": round(sorted_values[-1], 6)}
 
-# Event scheduler storage
-user_events = {}  # Format: {"2025-01-15": [event1, event2, ...]}
-event_counter = 1
 
-# Event type configuration
-EVENT_TYPES = {
-    "meeting": {"icon": "users", "color": "primary", "name": "Meeting"},
-    "deadline": {"icon": "calendar-x", "color": "danger", "name": "Deadline"}, 
-    "personal": {"icon": "user", "color": "info", "name": "Personal"},
-    "reminder": {"icon": "bell", "color": "warning", "name": "Reminder"}
-}
+job_queue = JobQueue(app.config['JOB_WORKERS'], app.config['JOB_QUEUE_SIZE'],
+                     app.config['JOB_MAX_ATTEMPTS'], app.config['JOB_RETRY_BACKOFF'],
+                     app.config['JOB_RESULT_TTL'], store=result_store)
 
-# Add some demo events to show persistence
-def initialize_demo_events():
-    """Add some sample events to demonstrate persistence."""
-    global event_counter, user_events
-    
-    demo_events = [
-        {
-            "date": "2025-01-15",
-            "title": "Team Standup",
-            "type": "meeting",
-            "time": "9:00 AM"
-        },
-        {
-            "date": "2025-01-15", 
-            "title": "Project Deadline",
-            "type": "deadline",
-            "time": "5:00 PM"
-        },
-        {
-            "date": "2025-01-20",
-            "title": "Doctor Appointment", 
-            "type": "personal",
-            "time": "2:00 PM"
-        },
-        {
-            "date": "2025-01-20",
-            "title": "Call Mom",
-            "type": "reminder",
-            "time": "7:00 PM"
-        }
-    ]
-    
-    for demo_event in demo_events:
-        date_str = demo_event["date"]
-        type_config = EVENT_TYPES.get(demo_event["type"], EVENT_TYPES["personal"])
-        
-        # Format date for display
-        from datetime import datetime
-        date_obj = datetime.fromisoformat(date_str)
-        formatted_date = date_obj.strftime("%A, %B %d, %Y")
-        
-        event = {
-            "id": event_counter,
-            "title": demo_event["title"],
-            "date": date_str,
-            "formatted_date": formatted_date,
-            "type": demo_event["type"],
-            "icon": type_config["icon"],
-            "color": type_config["color"],
-            "name": type_config["name"],
-            "time": demo_event.get("time"),
-            "created_at": datetime.now().isoformat()
-        }
-        
-        if date_str not in user_events:
-            user_events[date_str] = []
-        user_events[date_str].append(event)
-        event_counter += 1
 
-# Initialize demo events on startup
-initialize_demo_events()
+def job_accepted(fn, *args):
+    """Queue ``fn(*args)`` and answer 202 with a fragment that polls for the result."""
+    try:
+        job = job_queue.submit(fn, *args)
+    except queue.Full:
+        return "<p class='ty-text-danger'>❌ We're busy right now, please try again shortly</p>", 503
+    return render_job_status(job), 202
+
+
+def render_job_status(job):
+    return render_template("partials/job_status.html", job=job, max_attempts=job_queue.max_attempts,
+                           poll_interval=app.config['JOB_POLL_INTERVAL'])
+
+
+class UserSearchIndex:
+    """Inverted index over user name, email and role for typeahead search.
+
+    Every field is split into casefolded word tokens. ``_tokens`` maps a
+    token to the ids of users containing it, ``_prefixes`` maps each token
+    prefix of up to ``prefix_length`` characters to the tokens starting
+    with it; longer prefixes are looked up by bisecting the sorted
+    ``_vocabulary``. A query matches a user when each of its words is a
+    prefix of one of the user's tokens. Users are added and removed
+    incrementally; ``version`` changes on every update.
+    """
+
+    TOKEN_RE = re.compile(r"\w+")
+
+    def __init__(self, users=(), prefix_length=3):
+        self.prefix_length = prefix_length
+        self.version = 0
+        self._users = {}
+        self._ids = []
+        self._user_tokens = {}
+        self._vocabulary = []
+        self._tokens = {}
+        self._prefixes = {}
+        self._lock = threading.Lock()
+        # Bulk build: append, then sort once instead of inserting in order
+        for user in {user.id: user for user in users}.values():
+            self._add(user, list.append)
+        self._ids.sort()
+        self._vocabulary.sort()
+
+    @classmethod
+    def tokenize(cls, text):
+        return cls.TOKEN_RE.findall(text.casefold())
+
+    def add(self, user):
+        """Index ``user``, replacing any previous version with the same id."""
+        with self._lock:
+            self._remove(user.id)
+            self._add(user, bisect.insort)
+            self.version += 1
+
+    def _add(self, user, insert):
+        tokens = frozenset(self.tokenize(f"{user.name} {user.email} {user.role}"))
+        self._users[user.id] = user
+        insert(self._ids, user.id)
+        self._user_tokens[user.id] = tokens
+        for token in tokens:
+            ids = self._tokens.get(token)
+            if ids is None:
+                ids = self._tokens[token] = set()
+                insert(self._vocabulary, token)
+                for length in range(1, min(len(token), self.prefix_length) + 1):
+                    self._prefixes.setdefault(token[:length], set()).add(token)
+            ids.add(user.id)
+
+    def remove(self, user_id):
+        with self._lock:
+            if self._remove(user_id):
+                self.version += 1
+
+    def _remove(self, user_id):
+        tokens = self._user_tokens.pop(user_id, None)
+        if tokens is None:
+            return False
+        del self._users[user_id]
+        del self._ids[bisect.bisect_left(self._ids, user_id)]
+        for token in tokens:
+            ids = self._tokens[token]
+            ids.discard(user_id)
+            if not ids:
+                del self._tokens[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+                for length in range(1, min(len(token), self.prefix_length) + 1):
+                    prefix = self._prefixes[token[:length]]
+                    prefix.discard(token)
+                    if not prefix:
+                        del self._prefixes[token[:length]]
+        return True
+
+    def _matching_ids(self, word):
+        """Ids of users with a token starting with ``word``."""
+        if len(word) <= self.prefix_length:
+            candidates = self._prefixes.get(word, ())
+        else:
+            start = bisect.bisect_left(self._vocabulary, word)
+            candidates = itertools.takewhile(lambda token: token.startswith(word),
+                                             itertools.islice(self._vocabulary, start, None))
+        ids = set()
+        for token in candidates:
+            ids |= self._tokens[token]
+        return ids
+
+    def search(self, query, limit, cursor=0):
+        """One page of matches ordered by id, plus the total match count.
+
+        Returns ``(users, total, next_cursor)``; ``next_cursor`` is the last
+        id on the page, or None when this is the last page.
+        """
+        words = self.tokenize(query)
+        with self._lock:
+            if words:
+                # Intersect smallest first so the result shrinks quickly
+                matches = sorted((self._matching_ids(word) for word in words), key=len)
+                ids = matches[0].intersection(*matches[1:])
+                total = len(ids)
+                page = heapq.nsmallest(limit + 1, (user_id for user_id in ids if user_id > cursor))
+            else:
+                total = len(self._ids)
+                start = bisect.bisect_right(self._ids, cursor)
+                page = self._ids[start:start + limit + 1]
+            users = [self._users[user_id] for user_id in page[:limit]]
+        next_cursor = page[limit - 1] if len(page) > limit else None
+        return users, total, next_cursor
+
+
+user_index = UserSearchIndex(SAMPLE_USERS, app.config['USER_SEARCH_PREFIX_LENGTH'])
+
+
+class TaskIndex:
+    """Secondary index of tasks by (status, priority).
+
+    Each bucket is a sorted list of task ids, so a filtered page is a lazy
+    merge of at most len(TASK_STATUSES) * len(TASK_PRIORITIES) bucket
+    slices - its cost follows the page size, not the table size - and the
+    total is a sum of bucket lengths. Status changes must go through
+    ``set_status`` to keep the buckets current.
+    """
+
+    def __init__(self, tasks_by_id):
+        self._tasks = tasks_by_id
+        self._buckets = {}
+        self._lock = threading.Lock()
+        for task in tasks_by_id.values():
+            self._buckets.setdefault((task.status, task.priority), []).append(task.id)
+        for ids in self._buckets.values():
+            ids.sort()
+
+    def set_status(self, task, status):
+        with self._lock:
+            old_ids = self._buckets[(task.status, task.priority)]
+            task.status = status
+            del old_ids[bisect.bisect_left(old_ids, task.id)]
+            bisect.insort(self._buckets.setdefault((task.status, task.priority), []), task.id)
+
+    def query(self, status=None, priority=None, limit=20, cursor=None, by_priority=False):
+        """One page of tasks matching the filters, plus the total match count.
+
+        Tasks are ordered by id or, with ``by_priority``, by descending
+        priority and then id. ``cursor`` is the ``next_cursor`` of the
+        previous page: the (negated priority rank, id) sort key of its last
+        task. Returns ``(tasks, total, next_cursor)``.
+        """
+        with self._lock:
+            runs = []
+            total = 0
+            for (task_status, task_priority), ids in self._buckets.items():
+                if status not in (None, task_status) or priority not in (None, task_priority):
+                    continue
+                total += len(ids)
+                rank = -TASK_PRIORITIES.index(task_priority) if by_priority else 0
+                if cursor is None or rank > cursor[0]:
+                    start = 0
+                elif rank < cursor[0]:
+                    continue
+                else:
+                    start = bisect.bisect_right(ids, cursor[1])
+                runs.append(zip(itertools.repeat(rank), itertools.islice(ids, start, None)))
+            page = list(itertools.islice(heapq.merge(*runs), limit + 1))
+            tasks = [self._tasks[task_id] for _, task_id in page[:limit]]
+        next_cursor = page[limit - 1] if len(page) > limit else None
+        return tasks, total, next_cursor
+
+
+task_index = TaskIndex(TASKS_BY_ID)
+
+
+def format_task_cursor(cursor):
+    return f"{-cursor[0]}.{cursor[1]}"
+
+
+def parse_task_cursor(value):
+    """Inverse of ``format_task_cursor``; None (first page) if malformed."""
+    try:
+        rank, task_id = value.split(".")
+        return -int(rank), int(task_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def task_page(status=None, priority=None, sort=None, limit=None, cursor=None):
+    """Template context for one page of ``partials/task_list.html``."""
+    limit = limit or app.config['TASK_FILTER_PAGE_SIZE']
+    tasks, total, next_cursor = task_index.query(status, priority, limit, cursor, sort == "priority")
+    next_url = None
+    if next_cursor is not None:
+        next_url = url_for("filter_tasks", status=status, priority=priority, sort=sort,
+                           limit=limit, cursor=format_task_cursor(next_cursor))
+    return {"tasks": tasks, "total": total, "next_url": next_url}
 
 
 @app.route("/")
 def index():
     """Home page showcasing various Ty components."""
-    return render_template("index.html", users=SAMPLE_USERS[:5], tasks=SAMPLE_TASKS)
+    users, total, next_cursor = user_index.search("", 5)
+    tasks = task_page()
+    epoch, version = storage.data_version().rsplit(".", 1)
+    return render_template("index.html", users=users, total=total, limit=5, next_cursor=next_cursor,
+                           tasks=tasks["tasks"], next_url=tasks["next_url"],
+                           change_feed={"epoch": epoch, "version": int(version), "more": False},
+                           poll_interval=app.config['CHANGE_FEED_POLL_INTERVAL'])
 
 
 @app.route("/forms")
@@ -177,24 +2284,16 @@ def calendar():
     current_year = current_date.year
     current_month = current_date.month
     
-    # Set random seed for consistent demo events
-    random.seed(current_year * 100 + current_month)
+    # Per-request generator seeded for consistent demo events
+    rng = random.Random(current_year * 100 + current_month)
     
     # Generate some sample events for the current month
     initial_events = []
-    event_types = [
-        {"title": "Team Meeting", "icon": "users", "color": "primary", "time": "10:00 AM"},
-        {"title": "Code Review", "icon": "code", "color": "info", "time": "2:00 PM"},
-        {"title": "Client Call", "icon": "phone", "color": "success", "time": "3:30 PM"},
-        {"title": "Project Deadline", "icon": "calendar-x", "color": "danger", "time": "11:59 PM"},
-        {"title": "Workshop", "icon": "book-open", "color": "warning", "time": "9:00 AM"},
-        {"title": "Planning Session", "icon": "target", "color": "secondary", "time": "1:00 PM"},
-    ]
     
     # Ensure we have at least 3 events
     guaranteed_days = [5, 12, 20]  # Days that will always have events
     for day in guaranteed_days:
-        event_data = random.choice(event_types)
+        event_data = rng.choice(GENERATED_EVENT_TYPES)
         initial_events.append({
             "day": day,
             "date": f"{current_year}-{current_month:02d}-{day:02d}",
@@ -203,8 +2302,8 @@ def calendar():
     
     # Add some random events
     for day in range(1, 29):
-        if day not in guaranteed_days and random.random() < 0.25:  # 25% chance for other days
-            event_data = random.choice(event_types)
+        if day not in guaranteed_days and rng.random() < 0.25:  # 25% chance for other days
+            event_data = rng.choice(GENERATED_EVENT_TYPES)
             initial_events.append({
                 "day": day,
                 "date": f"{current_year}-{current_month:02d}-{day:02d}",
@@ -213,8 +2312,8 @@ def calendar():
     # Sort events by day
     initial_events.sort(key=lambda x: x["day"])
     
-    # Debug: Print events count for current month
-    print(f"📅 Calendar route: Generated {len(initial_events)} events for {current_month}/{current_year}")
+    calendar_log.debug("Calendar route generated events",
+                       extra={"count": len(initial_events), "month": current_month, "year": current_year})
     
     return render_template("calendar.html", 
                          initial_events=initial_events,
@@ -231,7 +2330,10 @@ def components():
 @app.route("/modals")
 def modals():
     """Modal examples with HTMX integration."""
-    return render_template("modals.html", users=SAMPLE_USERS[:3], tasks=SAMPLE_TASKS[:4])
+    return render_template("modals.html", users=SAMPLE_USERS[:3], tasks=SAMPLE_TASKS[:4],
+                           notification_transport=notification_transport(),
+                           after=notification_broadcaster.published,
+                           poll_interval=app.config['NOTIFICATION_POLL_INTERVAL'])
 
 
 # HTMX API endpoints
@@ -239,20 +2341,33 @@ def modals():
 
 @app.route("/api/users/search")
 def search_users():
-    """Search users for dropdown/multiselect components."""
-    query = request.args.get("q", "").lower()
-    filtered_users = [
-        user
-        for user in SAMPLE_USERS
-        if query in user["name"].lower() or query in user["email"].lower()
-    ]
-    return render_template("partials/user_search_results.html", users=filtered_users)
+    """Search users for dropdown/multiselect components.
+
+    Returns one page of matches; ``cursor`` is the ``next_cursor`` of the
+    previous page, whose "Load more" button fetches the next one.
+    """
+    query = " ".join(UserSearchIndex.tokenize(request.args.get("q", "")))
+    limit = request.args.get("limit", app.config['USER_SEARCH_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['USER_SEARCH_MAX_PAGE_SIZE']))
+    cursor = request.args.get("cursor", 0, type=int)
+
+    version = user_index.version
+
+    def render_page():
+        users, total, next_cursor = user_index.search(query, limit, cursor)
+        return render_template("partials/user_search_results.html", users=users, total=total,
+                               query=query, limit=limit, cursor=cursor, next_cursor=next_cursor)
+
+    # The rendered page goes straight into the query cache (not the fragment
+    # cache, which has no TTL), so hot typeahead queries skip both the index
+    # and Jinja, and results age out after QUERY_CACHE_TTL
+    return query_cache.get_or_compute(("users", version, query, limit, cursor), render_page)
 
 
 @app.route("/api/users/<int:user_id>")
 def get_user(user_id):
     """Get user details for dynamic loading."""
-    user = next((u for u in SAMPLE_USERS if u["id"] == user_id), None)
+    user = USERS_BY_ID.get(user_id)
     if not user:
         return "User not found", 404
     return render_template("partials/user_card.html", user=user)
@@ -260,46 +2375,54 @@ def get_user(user_id):
 
 @app.route("/api/tasks/filter")
 def filter_tasks():
-    """Filter tasks by status or priority."""
-    status = request.args.get("status")
-    priority = request.args.get("priority")
-    
-    # Debug logging
-    print(f"=== TASK FILTER DEBUG ===")
-    print(f"Status filter: '{status}'")
-    print(f"Priority filter: '{priority}'")
-    print(f"All request args: {dict(request.args)}")
-
-    filtered_tasks = SAMPLE_TASKS
-    if status:
-        filtered_tasks = [t for t in filtered_tasks if t["status"] == status]
-        print(f"After status filter: {len(filtered_tasks)} tasks")
-    if priority:
-        filtered_tasks = [t for t in filtered_tasks if t["priority"] == priority]
-        print(f"After priority filter: {len(filtered_tasks)} tasks")
-    
-    print(f"Final filtered tasks: {[t['title'] for t in filtered_tasks]}")
-    print("========================")
+    """Filter tasks by status or priority, one page at a time.
+
+    ``sort=priority`` orders by descending priority instead of id;
+    ``cursor`` comes from the previous page's "Load more" link. The total
+    number of matches is reported in ``X-Total-Count``.
+    """
+    status = request.args.get("status", "").strip().lower() or None
+    priority = request.args.get("priority", "").strip().lower() or None
+    sort = "priority" if request.args.get("sort") == "priority" else None
+    limit = request.args.get("limit", app.config['TASK_FILTER_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['TASK_FILTER_MAX_PAGE_SIZE']))
+    cursor = parse_task_cursor(request.args.get("cursor"))
+    version = tasks_version
+
+    if tasks_log.isEnabledFor(logging.DEBUG):
+        tasks_log.debug("Task filter", extra={"status": status, "priority": priority,
+                                              "query": request.args.to_dict()})
 
-    return render_template("partials/task_list.html", tasks=filtered_tasks)
+    def filter_pass():
+        page = task_page(status, priority, sort, limit, cursor)
+        if tasks_log.isEnabledFor(logging.DEBUG):
+            tasks_log.debug("Task filter page", extra={"total": page["total"],
+                                                       "titles": [t.title for t in page["tasks"]]})
+        return page
+
+    key = (status, priority, sort, limit, cursor)
+    page = query_cache.get_or_compute(("tasks", version) + key, filter_pass)
+    response = make_response(render_fragment("partials/task_list.html", key, version, lambda: page))
+    response.headers["X-Total-Count"] = str(page["total"])
+    return response
 
 
 @app.route("/api/tasks/<int:task_id>/toggle", methods=["POST"])
 def toggle_task(task_id):
     """Toggle task completion status."""
-    task = next((t for t in SAMPLE_TASKS if t["id"] == task_id), None)
+    task = TASKS_BY_ID.get(task_id)
     if task:
-        task["status"] = "completed" if task["status"] != "completed" else "pending"
+        task_index.set_status(task, "completed" if task.status != "completed" else "pending")
+        bump_tasks_version()
     return render_template("partials/task_item.html", task=task)
 
 
 @app.route("/api/test-debug")
 def test_debug():
     """Test endpoint for HTMX debugging."""
-    print("=== TEST DEBUG ENDPOINT ===")
-    print(f"Request method: {request.method}")
-    print(f"Headers: {dict(request.headers)}")
-    print("===========================")
+    if debug_log.isEnabledFor(logging.DEBUG):
+        debug_log.debug("Test debug endpoint", extra={"method": request.method,
+                                                      "headers": dict(request.headers)})
 
     return """
     <div class="ty-bg-success-soft p-3 rounded text-sm">
@@ -313,19 +2436,15 @@ def test_debug():
 @app.route("/api/form/validate", methods=["POST"])
 def validate_form():
     """Server-side form validation with Ty components using JSON."""
-    # Simple debug logging
-    print("=== FORM VALIDATION (JSON) ===")
-    print(f"Content-Type: {request.content_type}")
-    print(f"Is HTMX request: {'HX-Request' in request.headers}")
-    
     # Get data from JSON (when using hx-ext="json-enc") or form data (fallback)
     if request.is_json:
         data = request.get_json()
-        print(f"JSON data: {data}")
     else:
         data = request.form.to_dict()
-        print(f"Form data: {data}")
-    
+    if forms_log.isEnabledFor(logging.DEBUG):
+        forms_log.debug("Form validation", extra={"content_type": request.content_type,
+                                                  "htmx": "HX-Request" in request.headers, "data": data})
+
     errors = {}
 
     # Validate email
@@ -353,16 +2472,15 @@ def validate_form():
     # Handle role and skills (dropdown/multiselect data)
     role = data.get("role", "")
     skills = data.get("skills", "")
-    print(f"Role: {role}, Skills: {skills}")
 
     if errors:
-        print(f"Validation errors: {errors}")
+        forms_log.info("Validation failed", extra={"errors": errors})
         # Return 200 with error HTML so HTMX processes it normally
         return render_template("partials/form_errors.html", errors=errors), 200
 
     # Success case
-    print("Validation successful!")
-    form_submissions.append(
+    forms_log.info("Validation successful", extra={"role": role, "skills": skills})
+    storage.add_form_submission(
         {
             "name": name,
             "email": email,
@@ -377,89 +2495,167 @@ def validate_form():
 
 
 def generate_month_events_data(year, month):
-    """Shared function to generate consistent event data for a month."""
-    import calendar
-    import hashlib
-    
-    # Get number of days in the month
-    _, days_in_month = calendar.monthrange(year, month)
-    
-    # Event types available
-    event_types = [
-        {"title": "Team Meeting", "icon": "users", "color": "primary", "time": "10:00 AM"},
-        {"title": "Code Review", "icon": "code", "color": "info", "time": "2:00 PM"},
-        {"title": "Client Call", "icon": "phone", "color": "success", "time": "3:30 PM"},
-        {"title": "Project Deadline", "icon": "calendar-x", "color": "danger", "time": "11:59 PM"},
-        {"title": "Workshop", "icon": "book-open", "color": "warning", "time": "9:00 AM"},
-        {"title": "Planning Session", "icon": "target", "color": "secondary", "time": "1:00 PM"},
-    ]
-    
+    """Shared function to generate consistent event data for a month.
+
+    Output is deterministic per month, so it is memoized in
+    ``month_events_cache``; callers must treat the result as read-only.
+    """
+    return month_events_cache.get_or_compute(
+        (year, month), lambda: _generate_month_events_data(year, month))
+
+
+def _generate_month_events_data(year, month):
+    _, days_in_month = calendar_lib.monthrange(year, month)
+    return generate_events_data(date(year, month, 1), date(year, month, days_in_month))
+
+
+def generate_events_data(start, end):
+    """Generate consistent event data for every day in [start, end] in one pass.
+
+    Each day is seeded from the MD5 of its date string, so any day yields
+    the same events whichever range it is generated in. A single private
+    ``random.Random`` is reseeded per day - no shared global RNG state, and
+    no per-day generator or import overhead when producing whole years.
+    """
+    rng = random.Random()
+    md5 = hashlib.md5
+    event_types = GENERATED_EVENT_TYPES
     events_by_day = {}
-    
-    # Generate consistent event data for each day in the month
-    for day in range(1, days_in_month + 1):
-        date_str = f"{year}-{month:02d}-{day:02d}"
-        
-        # Use date as seed for consistent results
-        seed = int(hashlib.md5(date_str.encode()).hexdigest()[:8], 16)
-        random.seed(seed)
-        
-        event_count = random.randint(0, 3)
-        
-        # Generate detailed events for this day
-        day_events = []
-        for i in range(event_count):
-            event_data = random.choice(event_types)
-            day_events.append({
-                "day": day,
-                "date": date_str,
-                **event_data
-            })
-        
-        if day_events:
-            events_by_day[date_str] = day_events
-    
+
+    for ordinal in range(start.toordinal(), end.toordinal() + 1):
+        day = date.fromordinal(ordinal)
+        date_str = f"{day.year}-{day.month:02d}-{day.day:02d}"
+        rng.seed(int(md5(date_str.encode()).hexdigest()[:8], 16))
+
+        event_count = rng.randint(0, 3)
+        if event_count:
+            events_by_day[date_str] = [
+                {"day": day.day, "date": date_str, **rng.choice(event_types)}
+                for _ in range(event_count)
+            ]
+
     return events_by_day
 
 
+def prefill_month_events(start, end):
+    """Generate every month from ``start`` to ``end`` in one pass into the month cache."""
+    first = date(start.year, start.month, 1)
+    last = date(end.year, end.month, calendar_lib.monthrange(end.year, end.month)[1])
+    by_month = {}
+    for date_str, day_events in generate_events_data(first, last).items():
+        by_month.setdefault(date_str[:7], {})[date_str] = day_events
+
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        month_events_cache.set((year, month), by_month.get(f"{year}-{month:02d}", {}))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def parse_date_range(args):
+    """Parse ``from``/``to`` query args into dates, raising ValueError with a user-facing message."""
+    try:
+        start = datetime.strptime(args.get("from", ""), "%Y-%m-%d").date()
+        end = datetime.strptime(args.get("to", ""), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("from and to must both be YYYY-MM-DD dates")
+    if end < start:
+        raise ValueError("to must not be before from")
+    if (end - start).days >= app.config['CALENDAR_MAX_RANGE_DAYS']:
+        raise ValueError(f"Range is limited to {app.config['CALENDAR_MAX_RANGE_DAYS']} days")
+    return start, end
+
+
+def generated_events_between(start, end):
+    """Generated demo events dated within [start, end], ordered by date."""
+    events = []
+    year, month = start.year, start.month
+    start_str, end_str = start.isoformat(), end.isoformat()
+    while (year, month) <= (end.year, end.month):
+        events_by_day = generate_month_events_data(year, month)
+        # Keys are generated in day order, so bisect for the range boundaries
+        dates = list(events_by_day)
+        lo = bisect.bisect_left(dates, start_str)
+        hi = bisect.bisect_right(dates, end_str)
+        for date_str in dates[lo:hi]:
+            events.extend(events_by_day[date_str])
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return events
+
+
+def calendar_events_between(start, end):
+    """Generated and user-created events within [start, end], merged by date."""
+    user_events = [
+        {**event, "day": int(event["date"][8:10]), "user_event": True}
+        for event in storage.events_between(start.isoformat(), end.isoformat())
+    ]
+    # Both inputs are already ordered by date; the sort is a stable merge
+    events = generated_events_between(start, end) + user_events
+    events.sort(key=lambda x: x["date"])
+    return events
+
+
 @app.route("/api/calendar/events")
 def calendar_events():
-    """Get calendar events for a specific month - returns JSON for component-native rendering."""
+    """Get calendar events for a specific month - returns JSON for component-native rendering.
+
+    With ``from``/``to`` (YYYY-MM-DD) it instead returns every event in that
+    inclusive range - generated and user-created - in a single response.
+    """
+    if "from" in request.args or "to" in request.args:
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        def build_range():
+            events_list = calendar_events_between(start, end)
+            calendar_log.debug("Range events", extra={"count": len(events_list), "from": start, "to": end})
+            return {
+                "events": events_list,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "total_count": len(events_list)
+            }
+
+        return conditional_response(("calendar-events", start, end), build_range,
+                                    data_version=storage.data_version())
+
     year = int(request.args.get("year", datetime.now().year))
     month = int(request.args.get("month", datetime.now().month))
 
-    # Use shared event generation function
-    events_by_day = generate_month_events_data(year, month)
-    
-    # Flatten to a simple list with proper structure for client-side rendering
-    events_list = []
-    for date_str, day_events in events_by_day.items():
-        events_list.extend(day_events)
-    
-    # Sort events by day
-    events_list.sort(key=lambda x: x["day"])
+    def build_month():
+        # Use shared event generation function
+        events_by_day = generate_month_events_data(year, month)
+        
+        # Flatten to a simple list with proper structure for client-side rendering
+        events_list = []
+        for date_str, day_events in events_by_day.items():
+            events_list.extend(day_events)
+        
+        # Sort events by day
+        events_list.sort(key=lambda x: x["day"])
+
+        calendar_log.debug("Month events", extra={"count": len(events_list), "month": month, "year": year})
+
+        # Return JSON data for client-side rendering
+        return {
+            "events": events_list,
+            "month": month,
+            "year": year,
+            "total_count": len(events_list)
+        }
+
+    return conditional_response(("calendar-events", year, month), build_month)
 
-    # Debug: Print events count for API call
-    print(f"🌐 API call: Generated {len(events_list)} events for {month}/{year}")
 
-    # Return JSON data for client-side rendering
-    return {
-        "events": events_list,
-        "month": month,
-        "year": year,
-        "total_count": len(events_list)
-    }
 @app.route("/api/date/select", methods=["POST"])
 def select_date():
     """Handle date selection from calendar."""
     date_str = request.form.get("date")
     
-    # Debug logging
-    print(f"=== CALENDAR DATE SELECT DEBUG ===")
-    print(f"Raw date received: '{date_str}'")
-    print(f"All form data: {dict(request.form)}")
-    print("================================")
-    
+    if calendar_log.isEnabledFor(logging.DEBUG):
+        calendar_log.debug("Date select", extra={"date": date_str, "form": request.form.to_dict()})
+
     if date_str:
         try:
             # Parse and format the date nicely
@@ -467,15 +2663,15 @@ def select_date():
             date_obj = datetime.fromisoformat(date_str)
             formatted_date = date_obj.strftime("%A, %B %d, %Y")
             
-            selected_dates.append(
+            storage.add_selected_date(
                 {"date": date_str, "formatted": formatted_date, "timestamp": datetime.now().isoformat()}
             )
             return render_template("partials/selected_date.html", date=formatted_date)
         except Exception as e:
-            print(f"Date parsing error: {e}")
+            calendar_log.warning("Date parsing error", extra={"date": date_str, "error": str(e)})
             return f"<p class='ty-text-danger'>Error processing date: {str(e)}</p>", 400
     
-    print("No date received!")
+    calendar_log.warning("No date received")
     return "<p class='ty-text-danger'>No date received</p>", 400
 
 
@@ -607,19 +2803,19 @@ def calendar_date_select():
         # Format for display
         formatted_date = date_obj.strftime("%A, %B %d, %Y")
 
-        # Simulate some server processing
-        import random
+    except Exception as e:
+        return f"<p class='ty-text-danger'>❌ Error processing date: {str(e)}</p>"
 
+    def process():
+        # Simulate some server processing
         processing_time = random.uniform(0.1, 0.5)
-        import time
-
         time.sleep(processing_time)
 
         # Generate response
         day_name = date_obj.strftime("%A")
         is_weekend = day_name in ["Saturday", "Sunday"]
 
-        response_html = f"""
+        return f"""
         <div class="animate-fade-in space-y-3">
             <div class="flex items-center space-x-3">
                 <div class="w-3 h-3 rounded-full ty-bg-success"></div>
@@ -636,22 +2832,15 @@ def calendar_date_select():
         </div>
         """
 
-        return response_html
-
-    except Exception as e:
-        return f"<p class='ty-text-danger'>❌ Error processing date: {str(e)}</p>"
+    return deferred_response("Processing date...", process)
 
 
 @app.route("/api/calendar/select-date", methods=["POST"])
 def calendar_select_date():
     """Handle event calendar date selection - returns events for selected date."""
-    global event_counter
-    
-    # Debug logging
-    print("=== EVENT CALENDAR DATE SELECT ===")
-    print(f"Form data: {dict(request.form)}")
-    print("==================================")
-    
+    if calendar_log.isEnabledFor(logging.DEBUG):
+        calendar_log.debug("Event calendar date select", extra={"form": request.form.to_dict()})
+
     # Parse the date from ty-calendar change event
     event_date = request.form.get("event_date")  # ISO date string from form
     year = request.form.get("year")
@@ -674,34 +2863,25 @@ def calendar_select_date():
         return render_template("partials/event_list.html", events=[], selected_date="Unknown")
     
     try:
-        # Get events for this date
-        events = user_events.get(date_str, [])
-        
         # Format the date for display
         date_obj = datetime.fromisoformat(date_str)
         formatted_date = date_obj.strftime("%A, %B %d, %Y")
         
-        print(f"📅 Date selected: {date_str} ({formatted_date})")
-        print(f"📋 Found {len(events)} events")
-        
-        return render_template("partials/event_list.html", 
-                             events=events, 
-                             selected_date=formatted_date)
+        calendar_log.debug("Date selected", extra={"date": date_str})
+
+        return render_event_list(date_str, formatted_date)
         
     except Exception as e:
-        print(f"Error processing date selection: {e}")
+        calendar_log.warning("Error processing date selection", extra={"date": date_str, "error": str(e)})
         return render_template("partials/event_list.html", events=[], selected_date="Error")
 
 
 @app.route("/api/calendar/create-event", methods=["POST"])
 def create_event():
     """Create a new event for the selected date."""
-    global event_counter
-    
-    print("=== CREATE EVENT ===")
-    print(f"Form data: {dict(request.form)}")
-    print("===================")
-    
+    if events_log.isEnabledFor(logging.DEBUG):
+        events_log.debug("Create event", extra={"form": request.form.to_dict()})
+
     # Get form data
     event_title = request.form.get("event_title", "").strip()
     event_type = request.form.get("event_type", "personal")
@@ -715,258 +2895,426 @@ def create_event():
         return "<p class='ty-text-danger'>❌ Please select a date first</p>", 400
     
     try:
-        # Get event type configuration
-        type_config = EVENT_TYPES.get(event_type, EVENT_TYPES["personal"])
-        
-        # Parse date for validation
-        date_obj = datetime.fromisoformat(event_date)
-        formatted_date = date_obj.strftime("%A, %B %d, %Y")
-        
-        # Create new event
-        new_event = {
-            "id": event_counter,
-            "title": event_title,
-            "date": event_date,
-            "formatted_date": formatted_date,
-            "type": event_type,
-            "icon": type_config["icon"],
-            "color": type_config["color"],
-            "name": type_config["name"],
-            "time": None,  # Could be extended to include time
-            "created_at": datetime.now().isoformat()
-        }
-        
-        # Add to storage
-        if event_date not in user_events:
-            user_events[event_date] = []
-        user_events[event_date].append(new_event)
+        # Build (and validate the date of) the new event, then store it
+        new_event = storage.create_event(make_event_fields(event_title, event_date, event_type))
+        formatted_date = new_event["formatted_date"]
         
-        event_counter += 1
-        
-        print(f"✅ Created event: {event_title} on {formatted_date}")
-        print(f"📊 Total events for {event_date}: {len(user_events[event_date])}")
+        events_log.info("Created event", extra={"event_id": new_event["id"], "title": event_title,
+                                                "date": event_date})
         
         # Return updated event list
-        return render_template("partials/event_list.html", 
-                             events=user_events[event_date], 
-                             selected_date=formatted_date)
+        return render_event_list(event_date, formatted_date)
         
     except Exception as e:
-        print(f"Error creating event: {e}")
+        events_log.exception("Error creating event")
         return f"<p class='ty-text-danger'>❌ Error creating event: {str(e)}</p>", 500
 
 
 @app.route("/api/calendar/events/<int:event_id>", methods=["DELETE"])
 def delete_event(event_id):
     """Delete an event by ID."""
-    
-    print(f"=== DELETE EVENT {event_id} ===")
-    
-    # Find and remove the event
-    event_found = False
-    target_date = None
-    
-    for date_str, events in user_events.items():
-        for i, event in enumerate(events):
-            if event["id"] == event_id:
-                removed_event = events.pop(i)
-                event_found = True
-                target_date = date_str
-                print(f"🗑️ Deleted event: {removed_event['title']} from {date_str}")
-                break
-        if event_found:
-            break
-    
-    if not event_found:
+
+    # Remove the event via the id index
+    removed_event = storage.delete_event(event_id)
+    if removed_event is None:
         return "<p class='ty-text-danger'>❌ Event not found</p>", 404
     
+    target_date = removed_event["date"]
+    events_log.info("Deleted event", extra={"event_id": event_id, "title": removed_event["title"],
+                                            "date": target_date})
+    
     try:
         # Return updated event list for the date
-        remaining_events = user_events.get(target_date, [])
-        date_obj = datetime.fromisoformat(target_date)
-        formatted_date = date_obj.strftime("%A, %B %d, %Y")
-        
-        print(f"📊 Remaining events for {target_date}: {len(remaining_events)}")
-        
-        return render_template("partials/event_list.html", 
-                             events=remaining_events, 
-                             selected_date=formatted_date)
+        return render_event_list(target_date, removed_event["formatted_date"])
                              
     except Exception as e:
-        print(f"Error after deleting event: {e}")
+        events_log.exception("Error after deleting event")
         return f"<p class='ty-text-danger'>❌ Error: {str(e)}</p>", 500
 
 
-@app.route("/api/month-events/<int:year>/<int:month>")
-def month_events(year, month):
-    """Get all events for a specific month - returns JSON with event counts per day."""
+@app.route("/api/calendar/changes")
+def calendar_changes():
+    """Event creations and deletions after version ``since``.
+
+    Returns compact JSON (see ``change_feed``). HTMX requests instead get
+    out-of-band swaps: the ``#calendar-events`` list when a change (or a
+    reset) touches the page's selected ``event_date``, plus a replacement
+    poller carrying the new version. Pass back ``epoch`` from the previous
+    response so a restarted store is detected.
+    """
+    since = request.args.get("since", 0, type=int)
+    feed = storage.changes_since(since, app.config['CHANGE_FEED_PAGE_SIZE'])
+    if request.args.get("epoch", feed["epoch"]) != feed["epoch"]:
+        feed = {**feed, "reset": True, "more": False, "changes": []}
+
+    if "HX-Request" not in request.headers:
+        return jsonify(feed)
+
+    html = render_template("partials/calendar_changes.html", feed=feed, oob=True,
+                           poll_interval=app.config['CHANGE_FEED_POLL_INTERVAL'])
+    selected = request.args.get("event_date")
+    if selected and (feed["reset"] or any(change["date"] == selected for change in feed["changes"])):
+        try:
+            formatted_date = datetime.fromisoformat(selected).strftime("%A, %B %d, %Y")
+        except ValueError:
+            return html
+        html += f'<div id="calendar-events" hx-swap-oob="innerHTML">{render_event_list(selected, formatted_date)}</div>'
+    return html
+
+
+@app.route("/api/month-events/<int:year>/<int:month>")
+def month_events(year, month):
+    """Get all events for a specific month - returns JSON with event counts per day."""
+    def build():
+        try:
+            # Use shared event generation function
+            events_by_day = generate_month_events_data(year, month)
+            
+            # Convert to count format for calendar badges
+            events_data = {}
+            for date_str, day_events in events_by_day.items():
+                events_data[date_str] = len(day_events)
+            
+            return events_data
+            
+        except Exception:
+            calendar_log.exception("Error generating month events", extra={"year": year, "month": month})
+            return {}
+
+    return conditional_response(("month-events", year, month), build)
+
+
+@app.route("/api/day-events/<int:year>-<int:month>-<int:day>")
+def day_events(year, month, day):
+    """Get events for a specific day - returns HTML badge for calendar day content."""
+    def build():
+        try:
+            date_str = f"{year}-{month:02d}-{day:02d}"
+            
+            # Same deterministic data as the month views, served from the month cache
+            event_count = len(generate_month_events_data(year, month).get(date_str, ()))
+            
+            if event_count == 0:
+                return ""  # No badge for days with no events
+            else:
+                return f'<span class="event-badge">{event_count}</span>'
+                
+        except Exception:
+            calendar_log.exception("Error generating day events",
+                                   extra={"year": year, "month": month, "day": day})
+            return ""
+
+    return conditional_response(("day-events", year, month, day), build)
+
+
+@app.route("/api/day-badges")
+@app.route("/api/day-badges/<int:year>/<int:month>")
+def day_badges(year=None, month=None):
+    """Event badges for every day of a month (or a ``from``/``to`` range) in one response.
+
+    Returns a JSON map of date -> badge HTML. HTMX requests instead get one
+    out-of-band swap per day targeting ``#day-badge-YYYY-MM-DD`` cells, so a
+    whole calendar grid updates from a single round-trip.
+    """
     try:
-        # Use shared event generation function
-        events_by_day = generate_month_events_data(year, month)
-        
-        # Convert to count format for calendar badges
-        events_data = {}
-        for date_str, day_events in events_by_day.items():
-            events_data[date_str] = len(day_events)
+        if year is not None:
+            start = date(year, month, 1)
+            end = date(year, month, calendar_lib.monthrange(year, month)[1])
+        else:
+            start, end = parse_date_range(request.args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    is_htmx = "HX-Request" in request.headers
+
+    def build():
+        badges = {}
+        for ordinal in range(start.toordinal(), end.toordinal() + 1):
+            day = date.fromordinal(ordinal)
+            date_str = f"{day.year}-{day.month:02d}-{day.day:02d}"
+            event_count = len(generate_month_events_data(day.year, day.month).get(date_str, ()))
+            badges[date_str] = f'<span class="event-badge">{event_count}</span>' if event_count else ""
+
+        if is_htmx:
+            return "".join(
+                f'<span id="day-badge-{date_str}" hx-swap-oob="innerHTML">{badge}</span>'
+                for date_str, badge in badges.items()
+            )
+        return badges
+
+    response = conditional_response(("day-badges", start, end, is_htmx), build)
+    response.vary.add("HX-Request")
+    return response
+
+
+def fetch_weather():
+    """Current weather; the sleep stands in for the upstream API call."""
+    time.sleep(0.5)  # Simulate API delay
+    return {
+        "location": "Zagreb, Croatia",
+        "temperature": random.randint(15, 25),
+        "condition": random.choice(["Sunny", "Partly Cloudy", "Overcast", "Light Rain"]),
+        "humidity": random.randint(40, 80),
+        "wind": random.randint(5, 20)
+    }
+
+
+def weather_report(weather_data=None):
+    """Weather modal body, fetching the data (once per burst) if not given."""
+    if weather_data is None:
+        weather_data = upstream("weather", fetch_weather)
+    return f"""
+    <div class="p-8">
+        <div class="text-center mb-6">
+            <ty-icon name="cloud" class="w-16 h-16 mx-auto mb-4 ty-text-info"></ty-icon>
+            <h3 class="text-xl font-semibold ty-text-neutral-strong">Weather Report</h3>
+            <p class="ty-text-neutral-mild">{weather_data['location']}</p>
+        </div>
         
-        return events_data
+        <div class="grid grid-cols-2 gap-4 mb-6">
+            <div class="text-center ty-bg-primary-soft rounded-lg p-4">
+                <div class="text-3xl font-bold ty-text-primary-strong">{weather_data['temperature']}°C</div>
+                <div class="text-sm ty-text-neutral-mild">Temperature</div>
+            </div>
+            <div class="text-center ty-bg-info-soft rounded-lg p-4">
+                <div class="text-lg font-semibold ty-text-info-strong">{weather_data['condition']}</div>
+                <div class="text-sm ty-text-neutral-mild">Conditions</div>
+            </div>
+            <div class="text-center ty-bg-success-soft rounded-lg p-4">
+                <div class="text-lg font-bold ty-text-success-strong">{weather_data['humidity']}%</div>
+                <div class="text-sm ty-text-neutral-mild">Humidity</div>
+            </div>
+            <div class="text-center ty-bg-warning-soft rounded-lg p-4">
+                <div class="text-lg font-bold ty-text-warning-strong">{weather_data['wind']} km/h</div>
+                <div class="text-sm ty-text-neutral-mild">Wind Speed</div>
+            </div>
+        </div>
         
-    except Exception as e:
-        print(f"Error generating month events for {year}-{month}: {e}")
-        return {}
+        <div class="flex justify-end">
+            <ty-button flavor="info" onclick="document.getElementById('dynamic-modal').removeAttribute('open')">
+                <ty-icon name="check" class="mr-1"></ty-icon>
+                Close
+            </ty-button>
+        </div>
+    </div>
+    """
 
 
-@app.route("/api/day-events/<int:year>-<int:month>-<int:day>")
-def day_events(year, month, day):
-    """Get events for a specific day - returns HTML badge for calendar day content."""
+SERVICES = [
+    {"name": "Web Server", "status": "online", "uptime": "99.9%", "latency": (0.02, 0.1)},
+    {"name": "Database", "status": "online", "uptime": "99.7%", "latency": (0.05, 0.3)},
+    {"name": "API Gateway", "status": "warning", "uptime": "98.5%", "latency": (0.1, 0.5)},
+    {"name": "File Storage", "status": "online", "uptime": "99.8%", "latency": (0.05, 0.2)},
+    {"name": "Email Service", "status": "offline", "uptime": "97.2%", "latency": (0.3, 1.5)},
+]
+
+# Row colour and icon per check outcome
+SERVICE_STATES = {
+    "online": ("success", "check-circle"),
+    "warning": ("warning", "alert-triangle"),
+    "offline": ("danger", "x-circle"),
+    "timeout": ("neutral", "alert-circle"),
+    "pending": ("neutral", "refresh-cw"),
+}
+
+service_check_executor = ThreadPoolExecutor(max_workers=app.config['SERVICE_CHECK_WORKERS'],
+                                            thread_name_prefix="check")
+
+
+def check_service(service):
+    """One service's health; the sleep stands in for the real check."""
+    time.sleep(random.uniform(*service["latency"]))  # Simulate check latency
+    return {"status": service["status"], "uptime": service["uptime"], "checked_at": datetime.now()}
+
+
+def service_check(service, wait=True):
+    """``check_service`` through the upstream cache, one fetch per service at a time."""
+    return upstream("system-status", lambda: check_service(service),
+                    key=("system-status", service["name"]), wait=wait)
+
+
+def run_service_checks(timeout):
+    """Yield ``(index, result)`` for every service as its check completes.
+
+    All checks start at once on ``service_check_executor``; those still
+    running after ``timeout`` seconds are yielded with a "timeout" result
+    and left to finish into the cache. A failing check reports "offline".
+    """
+    futures = {service_check_executor.submit(service_check, service): index
+               for index, service in enumerate(SERVICES)}
+    pending = set(futures)
     try:
-        # Create date string for consistent seeding
-        date_str = f"{year}-{month:02d}-{day:02d}"
+        for future in as_completed(futures, timeout=timeout):
+            pending.discard(future)
+            try:
+                result = future.result()
+            except Exception:
+                result = {"status": "offline", "uptime": None, "checked_at": datetime.now()}
+            yield futures[future], result
+    except FuturesTimeoutError:
+        for future in pending:
+            yield futures[future], {"status": "timeout", "uptime": None, "checked_at": None}
+
+
+def render_service_row(service, result=None):
+    """One service's status row; ``result`` None renders it as still checking."""
+    state = result["status"] if result else "pending"
+    color, icon = SERVICE_STATES[state]
+    if state == "pending":
+        label, detail, spin = "Checking", "Waiting for response...", " animate-spin"
+    elif state == "timeout":
+        label, detail, spin = "Timed out", "No response in time", ""
+    else:
+        label, detail, spin = state, f"{result['uptime']} uptime" if result["uptime"] else "Check failed", ""
+    return f"""
+        <div class="flex items-center justify-between py-3 border-b ty-border-soft last:border-b-0">
+            <div class="flex items-center space-x-3">
+                <ty-icon name="{icon}" class="w-5 h-5 ty-text-{color}{spin}"></ty-icon>
+                <span class="font-medium">{service['name']}</span>
+            </div>
+            <div class="text-right">
+                <div class="text-sm font-semibold ty-text-{color}-strong capitalize">{label}</div>
+                <div class="text-xs ty-text-neutral-mild">{detail}</div>
+            </div>
+        </div>
+        """
+
+
+def render_checked_at(results):
+    """When the oldest of ``results`` was checked (cached rows may be older)."""
+    checked = [result["checked_at"] for result in results if result and result["checked_at"]]
+    if not checked:
+        return "No service responded"
+    return min(checked).strftime('%Y-%m-%d %H:%M:%S UTC')
+
+
+def system_status(results, stream_url=None):
+    """System status modal body.
+
+    With ``stream_url`` the modal connects to it over server-sent events:
+    rows without a result render as "checking" and are swapped in as the
+    stream delivers them, and the "done" event fills in the update time
+    and closes the connection.
+    """
+    if stream_url:
+        services_html = "".join(
+            f'<div sse-swap="service-{index}">{render_service_row(service, result)}</div>'
+            for index, (service, result) in enumerate(zip(SERVICES, results)))
+        connect = f'hx-ext="sse" sse-connect="{stream_url}" sse-close="done"'
+        checked_at = '<p class="text-sm ty-text-neutral-mild" sse-swap="done">Checking services...</p>'
+    else:
+        services_html = "".join(render_service_row(service, result)
+                                for service, result in zip(SERVICES, results))
+        connect = ""
+        checked_at = f'<p class="text-sm ty-text-neutral-mild">{render_checked_at(results)}</p>'
+
+    return f"""
+    <div class="p-8" {connect}>
+        <div class="text-center mb-6">
+            <ty-icon name="activity" class="w-16 h-16 mx-auto mb-4 ty-text-warning"></ty-icon>
+            <h3 class="text-xl font-semibold ty-text-neutral-strong">System Status</h3>
+            <p class="ty-text-neutral-mild">Real-time service monitoring</p>
+        </div>
         
-        # Simple mock data based on date for consistent results
-        import hashlib
-        # Use date as seed for consistent results across reloads
-        seed = int(hashlib.md5(date_str.encode()).hexdigest()[:8], 16)
-        random.seed(seed)
+        <div class="mb-6">
+            {services_html}
+        </div>
         
-        event_count = random.randint(0, 3)
+        <div class="ty-bg-neutral-soft rounded-lg p-4 mb-6">
+            <div class="flex items-center space-x-2 mb-2">
+                <ty-icon name="info" class="w-4 h-4 ty-text-info"></ty-icon>
+                <span class="text-sm font-medium">Last Updated</span>
+            </div>
+            {checked_at}
+        </div>
         
-        if event_count == 0:
-            return ""  # No badge for days with no events
-        else:
-            return f'<span class="event-badge">{event_count}</span>'
-            
-    except Exception as e:
-        print(f"Error generating day events for {year}-{month}-{day}: {e}")
-        return ""
+        <div class="flex justify-end">
+            <ty-button flavor="warning" onclick="document.getElementById('dynamic-modal').removeAttribute('open')">
+                <ty-icon name="x" class="mr-1"></ty-icon>
+                Close
+            </ty-button>
+        </div>
+    </div>
+    """
+
+
+@app.route("/api/system-status/stream")
+def system_status_stream():
+    """Server-sent events: one rendered row per service check, then "done"."""
+    timeout = app.config['SERVICE_CHECK_TIMEOUT']
+
+    def stream():
+        results = [None] * len(SERVICES)
+        for index, result in run_service_checks(timeout):
+            results[index] = result
+            yield sse_frame(f"service-{index}", render_service_row(SERVICES[index], result))
+        yield sse_frame("done", render_checked_at(results))
+
+    return app.response_class(stream(), mimetype="text/event-stream",
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def slow_loading():
+    """Deliberately slow modal body for the loading-state demo."""
+    # Simulate slow loading
+    time.sleep(2)
+    return f"""
+    <div class="p-8 text-center">
+        <ty-icon name="check-circle" class="w-16 h-16 mx-auto mb-4 ty-text-success animate-bounce"></ty-icon>
+        <h3 class="text-xl font-semibold ty-text-success-strong mb-2">Content Loaded!</h3>
+        <p class="ty-text-neutral-mild mb-4">
+            This content took 2 seconds to load, demonstrating loading states and indicators.
+        </p>
+        <div class="ty-bg-success-soft rounded-lg p-4 mb-6">
+            <p class="text-sm ty-text-neutral-mild">
+                <strong>Pro tip:</strong> Use loading indicators to keep users informed during longer operations.
+            </p>
+        </div>
+        <ty-button flavor="success" onclick="document.getElementById('loading-modal').removeAttribute('open')">
+            <ty-icon name="thumbs-up" class="mr-1"></ty-icon>
+            Got it!
+        </ty-button>
+    </div>
+    """
 
 
 @app.route("/api/modal/content/<content_type>")
 def modal_content(content_type):
     """Dynamic modal content loading."""
     if content_type == "user-profile":
-        user_id = request.args.get("user_id")
-        if not user_id:
+        user_id = request.args.get("user_id", type=int)
+        if user_id is None:
             return "User ID required", 400
-        user = next((u for u in SAMPLE_USERS if u["id"] == int(user_id)), None)
+        user = USERS_BY_ID.get(user_id)
         if not user:
             return "User not found", 404
-        return render_template("partials/user_profile_modal.html", user=user)
+        return render_fragment("partials/user_profile_modal.html", user.id, 0,
+                               lambda: {"user": user})
 
     elif content_type == "task-details":
-        task_id = request.args.get("task_id")
-        if not task_id:
+        task_id = request.args.get("task_id", type=int)
+        if task_id is None:
             return "Task ID required", 400
-        task = next((t for t in SAMPLE_TASKS if t["id"] == int(task_id)), None)
+        task = TASKS_BY_ID.get(task_id)
         if not task:
             return "Task not found", 404
-        return render_template("partials/task_details_modal.html", task=task)
+        return render_fragment("partials/task_details_modal.html", task.id, tasks_version,
+                               lambda: {"task": task})
 
     elif content_type == "weather-report":
-        # Simulate weather data
-        import time
-        time.sleep(0.5)  # Simulate API delay
-        weather_data = {
-            "location": "Zagreb, Croatia",
-            "temperature": random.randint(15, 25),
-            "condition": random.choice(["Sunny", "Partly Cloudy", "Overcast", "Light Rain"]),
-            "humidity": random.randint(40, 80),
-            "wind": random.randint(5, 20)
-        }
-        return f"""
-        <div class="p-8">
-            <div class="text-center mb-6">
-                <ty-icon name="cloud" class="w-16 h-16 mx-auto mb-4 ty-text-info"></ty-icon>
-                <h3 class="text-xl font-semibold ty-text-neutral-strong">Weather Report</h3>
-                <p class="ty-text-neutral-mild">{weather_data['location']}</p>
-            </div>
-            
-            <div class="grid grid-cols-2 gap-4 mb-6">
-                <div class="text-center ty-bg-primary-soft rounded-lg p-4">
-                    <div class="text-3xl font-bold ty-text-primary-strong">{weather_data['temperature']}°C</div>
-                    <div class="text-sm ty-text-neutral-mild">Temperature</div>
-                </div>
-                <div class="text-center ty-bg-info-soft rounded-lg p-4">
-                    <div class="text-lg font-semibold ty-text-info-strong">{weather_data['condition']}</div>
-                    <div class="text-sm ty-text-neutral-mild">Conditions</div>
-                </div>
-                <div class="text-center ty-bg-success-soft rounded-lg p-4">
-                    <div class="text-lg font-bold ty-text-success-strong">{weather_data['humidity']}%</div>
-                    <div class="text-sm ty-text-neutral-mild">Humidity</div>
-                </div>
-                <div class="text-center ty-bg-warning-soft rounded-lg p-4">
-                    <div class="text-lg font-bold ty-text-warning-strong">{weather_data['wind']} km/h</div>
-                    <div class="text-sm ty-text-neutral-mild">Wind Speed</div>
-                </div>
-            </div>
-            
-            <div class="flex justify-end">
-                <ty-button flavor="info" onclick="document.getElementById('dynamic-modal').removeAttribute('open')">
-                    <ty-icon name="check" class="mr-1"></ty-icon>
-                    Close
-                </ty-button>
-            </div>
-        </div>
-        """
+        # Fresh or stale-but-usable data renders inline; only a cold miss
+        # pays for the upstream call, on the I/O pool
+        weather_data = upstream("weather", fetch_weather, wait=False)
+        if weather_data is None:
+            return deferred_response("Fetching weather...", weather_report)
+        return weather_report(weather_data)
 
     elif content_type == "system-status":
-        # Simulate system status data
-        import time
-        time.sleep(0.3)
-        services = [
-            {"name": "Web Server", "status": "online", "uptime": "99.9%"},
-            {"name": "Database", "status": "online", "uptime": "99.7%"},
-            {"name": "API Gateway", "status": "warning", "uptime": "98.5%"},
-            {"name": "File Storage", "status": "online", "uptime": "99.8%"},
-            {"name": "Email Service", "status": "offline", "uptime": "97.2%"}
-        ]
-        
-        services_html = ""
-        for service in services:
-            status_color = "success" if service["status"] == "online" else ("warning" if service["status"] == "warning" else "danger")
-            status_icon = "check-circle" if service["status"] == "online" else ("alert-triangle" if service["status"] == "warning" else "x-circle")
-            
-            services_html += f"""
-            <div class="flex items-center justify-between py-3 border-b ty-border-soft last:border-b-0">
-                <div class="flex items-center space-x-3">
-                    <ty-icon name="{status_icon}" class="w-5 h-5 ty-text-{status_color}"></ty-icon>
-                    <span class="font-medium">{service['name']}</span>
-                </div>
-                <div class="text-right">
-                    <div class="text-sm font-semibold ty-text-{status_color}-strong capitalize">{service['status']}</div>
-                    <div class="text-xs ty-text-neutral-mild">{service['uptime']} uptime</div>
-                </div>
-            </div>
-            """
-        
-        return f"""
-        <div class="p-8">
-            <div class="text-center mb-6">
-                <ty-icon name="activity" class="w-16 h-16 mx-auto mb-4 ty-text-warning"></ty-icon>
-                <h3 class="text-xl font-semibold ty-text-neutral-strong">System Status</h3>
-                <p class="ty-text-neutral-mild">Real-time service monitoring</p>
-            </div>
-            
-            <div class="mb-6">
-                {services_html}
-            </div>
-            
-            <div class="ty-bg-neutral-soft rounded-lg p-4 mb-6">
-                <div class="flex items-center space-x-2 mb-2">
-                    <ty-icon name="info" class="w-4 h-4 ty-text-info"></ty-icon>
-                    <span class="text-sm font-medium">Last Updated</span>
-                </div>
-                <p class="text-sm ty-text-neutral-mild">{datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
-            </div>
-            
-            <div class="flex justify-end">
-                <ty-button flavor="warning" onclick="document.getElementById('dynamic-modal').removeAttribute('open')">
-                    <ty-icon name="x" class="mr-1"></ty-icon>
-                    Close
-                </ty-button>
-            </div>
-        </div>
-        """
+        # Cached rows render inline; if any check is missing the modal
+        # streams the rest in as the (concurrent) checks complete
+        results = [service_check(service, wait=False) for service in SERVICES]
+        if None in results:
+            return system_status(results, stream_url=url_for("system_status_stream"))
+        return system_status(results)
 
     elif content_type == "random-quote":
         # Random inspirational quotes
@@ -1005,27 +3353,7 @@ def modal_content(content_type):
         """
 
     elif content_type == "slow-loading":
-        # Simulate slow loading
-        import time
-        time.sleep(2)
-        return f"""
-        <div class="p-8 text-center">
-            <ty-icon name="check-circle" class="w-16 h-16 mx-auto mb-4 ty-text-success animate-bounce"></ty-icon>
-            <h3 class="text-xl font-semibold ty-text-success-strong mb-2">Content Loaded!</h3>
-            <p class="ty-text-neutral-mild mb-4">
-                This content took 2 seconds to load, demonstrating loading states and indicators.
-            </p>
-            <div class="ty-bg-success-soft rounded-lg p-4 mb-6">
-                <p class="text-sm ty-text-neutral-mild">
-                    <strong>Pro tip:</strong> Use loading indicators to keep users informed during longer operations.
-                </p>
-            </div>
-            <ty-button flavor="success" onclick="document.getElementById('loading-modal').removeAttribute('open')">
-                <ty-icon name="thumbs-up" class="mr-1"></ty-icon>
-                Got it!
-            </ty-button>
-        </div>
-        """
+        return deferred_response("Loading content...", slow_loading)
 
     elif content_type == "error-demo":
         # Simulate different types of errors
@@ -1107,11 +3435,10 @@ def submit_contact_form():
         </div>
         """
     
-    # Success - simulate form submission
-    import time
-    time.sleep(0.5)  # Simulate processing
-    
-    return f"""
+    # Success - deliver the message in the background
+    def process():
+        time.sleep(0.5)  # Simulate processing
+        return f"""
     <div class="ty-bg-success-soft border border-success rounded-lg p-4 mb-4 text-center">
         <ty-icon name="check-circle" class="w-8 h-8 mx-auto mb-2 ty-text-success"></ty-icon>
         <div class="font-medium ty-text-success-strong mb-1">Message Sent Successfully!</div>
@@ -1124,6 +3451,8 @@ def submit_contact_form():
     </script>
     """
 
+    return job_accepted(process)
+
 
 @app.route("/api/modal/wizard/start")
 def start_wizard():
@@ -1344,13 +3673,11 @@ def wizard_step3():
 @app.route("/api/modal/wizard/complete", methods=["POST"])
 def wizard_complete():
     """Complete the wizard setup."""
-    # Simulate processing
-    import time
-    time.sleep(1)
-    
     name = request.form.get("wizard_name", "User")
-    
-    return f"""
+
+    def process():
+        time.sleep(1)  # Simulate processing
+        return f"""
     <div class="p-8 text-center">
         <ty-icon name="check-circle" class="w-20 h-20 mx-auto mb-6 ty-text-success animate-bounce"></ty-icon>
         <h3 class="text-2xl font-semibold ty-text-success-strong mb-2">Setup Complete!</h3>
@@ -1382,19 +3709,225 @@ def wizard_complete():
     </script>
     """
 
+    return job_accepted(process)
+
+
+@app.route("/api/deferred/<deferred_id>")
+def deferred_result(deferred_id):
+    """Result of work started by ``deferred_response``, or the placeholder again."""
+    future = deferred_results.poll(deferred_id)
+    if future is None:
+        return "<p class='ty-text-danger'>❌ This result has expired, please try again</p>"
+    if not future.done():
+        return render_deferred_placeholder(deferred_id, "Still working...")
+    try:
+        return future.result()
+    except Exception as e:
+        return f"<p class='ty-text-danger'>❌ Error: {str(e)}</p>"
+
+
+@app.route("/api/jobs/<job_id>")
+def job_status(job_id):
+    """Result of a background job, or its status fragment (which keeps polling)."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return "<p class='ty-text-danger'>❌ This job has expired, please try again</p>"
+    if job.status == "done":
+        return job.result
+    if job.status == "failed":
+        return f"<p class='ty-text-danger'>❌ Failed after {job.attempts} attempts: {job.error}</p>"
+    return render_job_status(job)
+
+
+@app.route("/api/job-queue-status")
+def job_queue_status():
+    """Queue depth, outcome counters and queue-wait/latency percentiles."""
+    return jsonify(job_queue.stats())
+
+
+def sse_frame(event, data):
+    """A server-sent event named ``event`` carrying (multi-line) ``data``."""
+    return f"event: {event}\n" + "".join(f"data: {line}\n" for line in data.strip().splitlines()) + "\n"
+
+
+class Subscriber:
+    """One connected stream: a bounded buffer of frames waiting to be sent."""
+
+    def __init__(self, maxlen):
+        self.frames = deque(maxlen=maxlen)
+        self.dropped = 0
+        self.cond = threading.Condition()
+
+    def push(self, frame):
+        with self.cond:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1  # Slow client: the oldest frame is lost
+            self.frames.append(frame)
+            self.cond.notify()
+
+    def wait(self, timeout):
+        """Every buffered frame, waiting up to ``timeout`` seconds for one."""
+        with self.cond:
+            if not self.frames:
+                self.cond.wait(timeout)
+            frames = list(self.frames)
+            self.frames.clear()
+            return frames
+
+
+class Broadcaster:
+    """Fan-out of server-sent events to every subscribed client.
+
+    ``publish()`` formats a frame once and appends it to each subscriber's
+    bounded buffer, so a slow client drops its oldest frames instead of
+    growing memory or blocking the publisher. ``stream()`` yields frames
+    as they arrive, a heartbeat comment when idle (which also detects
+    closed connections) and ends after ``max_age`` seconds; EventSource
+    reconnects on its own. Each open stream occupies a worker thread under
+    threaded servers, hence ``max_clients`` - run gevent workers to hold
+    many connections cheaply. The last ``buffer_size`` events are also kept
+    for clients that poll ``since()`` instead of streaming.
+    """
+
+    def __init__(self, buffer_size, heartbeat, max_age, max_clients):
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_age = max_age
+        self.max_clients = max_clients
+        self._subscribers = set()
+        self._recent = deque(maxlen=buffer_size)  # (sequence number, event, data)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self):
+        """A new Subscriber, or None when ``max_clients`` are connected."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            subscriber = Subscriber(self.buffer_size)
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def publish(self, event, data):
+        frame = sse_frame(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+            self._recent.append((self.published, event, data))
+        for subscriber in subscribers:
+            subscriber.push(frame)
+        return len(subscribers)
+
+    def stream(self, subscriber):
+        deadline = time.monotonic() + self.max_age
+        yield "retry: 3000\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            frames = subscriber.wait(min(self.heartbeat, remaining))
+            yield "".join(frames) if frames else ": heartbeat\n\n"
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def since(self, after, event):
+        """Latest sequence number and the ``event`` data published after ``after``.
+
+        A cursor ahead of this process (a restart, or another worker) is
+        treated as current rather than replaying everything.
+        """
+        with self._lock:
+            after = min(after, self.published)
+            return self.published, [data for seq, name, data in self._recent if seq > after and name == event]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": len(self._subscribers),
+                "max_clients": self.max_clients,
+                "published": self.published,
+                "dropped_frames": sum(subscriber.dropped for subscriber in self._subscribers),
+            }
+
+
+def notification_transport():
+    """How pages receive broadcast notifications: "sse" or "poll".
+
+    "auto" streams only when gevent has patched threading (``gunicorn -k
+    gevent``), where a stream costs a greenlet; under threaded servers each
+    stream would pin a thread, so pages poll instead.
+    """
+    transport = app.config['NOTIFICATION_TRANSPORT']
+    if transport == "auto":
+        gevent_monkey = sys.modules.get("gevent.monkey")
+        patched = gevent_monkey is not None and gevent_monkey.is_module_patched("threading")
+        transport = "sse" if patched else "poll"
+    return transport
+
+
+notification_broadcaster = Broadcaster(app.config['NOTIFICATION_STREAM_BUFFER'],
+                                       app.config['NOTIFICATION_STREAM_HEARTBEAT'],
+                                       app.config['NOTIFICATION_STREAM_MAX_AGE'],
+                                       app.config['NOTIFICATION_STREAM_MAX_CLIENTS'])
+
+DEMO_NOTIFICATIONS = [
+    {"type": "success", "message": "Task completed successfully!"},
+    {"type": "warning", "message": "Server maintenance scheduled for tonight."},
+    {"type": "info", "message": "New features available in the dashboard."},
+    {"type": "error", "message": "Failed to save changes. Please try again."},
+]
+
+
+def render_notification(notification):
+    """Notification toast, rendered once per distinct notification."""
+    return render_fragment("partials/notification.html", (notification["type"], notification["message"]),
+                           0, lambda: notification)
+
 
 @app.route("/api/notifications/demo")
 def demo_notification():
     """Generate a demo notification."""
-    notifications = [
-        {"type": "success", "message": "Task completed successfully!"},
-        {"type": "warning", "message": "Server maintenance scheduled for tonight."},
-        {"type": "info", "message": "New features available in the dashboard."},
-        {"type": "error", "message": "Failed to save changes. Please try again."},
-    ]
+    return render_notification(random.choice(DEMO_NOTIFICATIONS))
+
+
+@app.route("/api/notifications/broadcast", methods=["POST"])
+def broadcast_notification():
+    """Push a demo notification to every browser connected to the stream."""
+    notification_broadcaster.publish("notification", render_notification(random.choice(DEMO_NOTIFICATIONS)))
+    return "", 204
 
-    notification = random.choice(notifications)
-    return render_template("partials/notification.html", **notification)
+
+@app.route("/api/notifications/stream")
+def notification_stream():
+    """Server-sent events carrying rendered notification toasts."""
+    subscriber = notification_broadcaster.subscribe()
+    if subscriber is None:
+        return "Too many notification streams", 503, {"Retry-After": "30"}
+    response = app.response_class(notification_broadcaster.stream(subscriber), mimetype="text/event-stream",
+                                  headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # Runs when the connection closes, even if the stream never started
+    response.call_on_close(lambda: notification_broadcaster.unsubscribe(subscriber))
+    return response
+
+
+@app.route("/api/notifications/poll")
+def poll_notifications():
+    """Notification toasts published after ``after``, for pages that poll.
+
+    Returns the new toasts plus an out-of-band replacement poller carrying
+    the latest sequence number.
+    """
+    latest, toasts = notification_broadcaster.since(request.args.get("after", 0, type=int), "notification")
+    return "".join(toasts) + render_template("partials/notification_poller.html", after=latest, oob=True,
+                                             poll_interval=app.config['NOTIFICATION_POLL_INTERVAL'])
+
+
+@app.route("/api/notifications/status")
+def notification_status():
+    """Connected stream clients, broadcast counters and the page transport."""
+    return jsonify({**notification_broadcaster.stats(), "transport": notification_transport()})
 
 
 # Error handlers
@@ -1421,26 +3954,277 @@ def datetime_format(value, format_str="%B %d, %Y at %I:%M %p"):
     return value
 
 
+@app.route("/api/cache-status")
+def cache_status():
+    """Debug endpoint reporting size and hit/miss counters for every cache."""
+    return jsonify({name: cache.stats() for name, cache in CACHES.items()})
+
+
+def prometheus_labels(**labels):
+    return "{" + ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()) + "}"
+
+
+def prometheus_histogram(lines, name, buckets, histograms, label_names):
+    """Append ``_bucket``/``_sum``/``_count`` series for each labelled histogram."""
+    for key, histogram in sorted(histograms.items()):
+        labels = dict(zip(label_names, key if isinstance(key, tuple) else (key,)))
+        cumulative = 0
+        for bound, count in zip(buckets + ("+Inf",), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{prometheus_labels(**labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{prometheus_labels(**labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{prometheus_labels(**labels)} {cumulative}")
+
+
+@app.route("/metrics")
+def metrics():
+    """Request metrics in the Prometheus text exposition format."""
+    snapshot = request_metrics.snapshot()
+    latency_buckets = request_metrics.latency_buckets
+    lines = [
+        "# HELP ty_demo_request_duration_seconds Request latency by endpoint and phase "
+        "(total = handler + render + compress).",
+        "# TYPE ty_demo_request_duration_seconds histogram",
+    ]
+    prometheus_histogram(lines, "ty_demo_request_duration_seconds", latency_buckets,
+                         snapshot["latency"], ("endpoint", "phase"))
+
+    lines += [
+        "# HELP ty_demo_request_duration_quantile_seconds Latency quantiles estimated from the histogram buckets.",
+        "# TYPE ty_demo_request_duration_quantile_seconds gauge",
+    ]
+    for (endpoint, phase), histogram in sorted(snapshot["latency"].items()):
+        for q in (0.5, 0.95, 0.99):
+            value = histogram_quantile(q, latency_buckets, histogram.counts)
+            lines.append(f"ty_demo_request_duration_quantile_seconds"
+                         f"{prometheus_labels(endpoint=endpoint, phase=phase, quantile=q)} {value:.6f}")
+
+    lines += [
+        "# HELP ty_demo_response_size_bytes Response body size (after compression) by endpoint.",
+        "# TYPE ty_demo_response_size_bytes histogram",
+    ]
+    prometheus_histogram(lines, "ty_demo_response_size_bytes", request_metrics.size_buckets,
+                         snapshot["sizes"], ("endpoint",))
+
+    lines += [
+        "# HELP ty_demo_responses_total Responses by endpoint and status code.",
+        "# TYPE ty_demo_responses_total counter",
+    ]
+    lines += [f"ty_demo_responses_total{prometheus_labels(endpoint=endpoint, status=status)} {count}"
+              for (endpoint, status), count in sorted(snapshot["responses"].items())]
+
+    lines += [
+        "# HELP ty_demo_requests_in_flight Requests currently being handled by endpoint.",
+        "# TYPE ty_demo_requests_in_flight gauge",
+    ]
+    lines += [f"ty_demo_requests_in_flight{prometheus_labels(endpoint=endpoint)} {count}"
+              for endpoint, count in sorted(snapshot["inflight"].items())]
+
+    return "\n".join(lines) + "\n", 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.route("/api/logging-status")
+def logging_status():
+    """Log levels in effect plus records queued, dropped and sampled out."""
+    return jsonify({
+        "level": logging.getLevelName(logger.getEffectiveLevel()),
+        "levels": app.config['LOG_LEVELS'],
+        "sampling": app.config['LOG_SAMPLING'],
+        "queued": log_handler.queue.qsize(),
+        "dropped": log_handler.dropped,
+        "sampled_out": sum(f.sampled_out for f in log_handler.filters),
+    })
+
+
 @app.route("/api/compression-status")
 def compression_status():
-    """Debug endpoint to check if compression is working."""
+    """Compression configuration plus what it has actually cost so far."""
     status_info = {
         "compression_enabled": compress is not None,
         "compress_mimetypes": app.config.get('COMPRESS_MIMETYPES', []),
+        "compress_algorithms": compress.enabled_algorithms,
         "compress_level": app.config.get('COMPRESS_LEVEL', 'default'),
+        "compress_br_level": app.config.get('COMPRESS_BR_LEVEL', 'default'),
         "compress_min_size": app.config.get('COMPRESS_MIN_SIZE', 'default'),
-        "test_content": "This is a test response that should be compressed if gzip is working properly. " * 20
+        "adaptive": {
+            "enabled": app.config['COMPRESS_ADAPTIVE'],
+            "inflight_requests": inflight_requests,
+            "saturated_at": app.config['COMPRESS_ADAPTIVE_SATURATED'],
+            "idle_at": app.config['COMPRESS_ADAPTIVE_IDLE'],
+            "levels": app.config['COMPRESS_ADAPTIVE_LEVELS'],
+            "skip_ratio": app.config['COMPRESS_ADAPTIVE_SKIP_RATIO'],
+        },
+        "response_cache": compress.stats(),
+        **compress.telemetry(),
     }
-    
-    # Return a large JSON response to trigger compression
+
     return jsonify(status_info)
 
 
+class StaticAssets:
+    """Fingerprinted, precompressed copies of the files under ``static/``.
+
+    ``build()`` hashes each file's content and writes gzip (level 9) and
+    brotli (quality 11) sidecars named after the hash into ``build_dir``.
+    Sidecars that already exist are reused, so only changed files are
+    recompressed after a deploy. Calling ``build()`` again only rehashes
+    files whose modification time changed.
+    """
+
+    IMMUTABLE = "public, max-age=31536000, immutable"
+
+    def __init__(self, static_folder, build_dir, extensions):
+        self.static_folder = static_folder
+        self.build_dir = build_dir
+        self.extensions = extensions
+        self.hashed_names = {}  # {"css/app.css": "css/app.1a2b3c4d5e6f.css"}
+        self.assets = {}        # {"css/app.1a2b3c4d5e6f.css": {...}}
+        self.mtimes = {}        # {"/abs/static/css/app.css": 1700000000123456789}
+
+    def build(self):
+        os.makedirs(self.build_dir, exist_ok=True)
+        for root, _, files in os.walk(self.static_folder):
+            for file_name in files:
+                if file_name.endswith(self.extensions):
+                    path = os.path.join(root, file_name)
+                    mtime = os.stat(path).st_mtime_ns
+                    if self.mtimes.get(path) != mtime:
+                        self._build_file(path)
+                        self.mtimes[path] = mtime
+
+    def _build_file(self, path):
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        logical = os.path.relpath(path, self.static_folder).replace(os.sep, "/")
+        stem, ext = os.path.splitext(logical)
+        hashed = f"{stem}.{digest}{ext}"
+
+        asset = {
+            "source": path,
+            "digest": digest,
+            "mimetype": mimetypes.guess_type(logical)[0] or "application/octet-stream",
+            "gzip": self._sidecar(digest + ".gz", lambda: gzip.compress(content, 9, mtime=0)),
+            "br": None,
+        }
+        if brotli is not None:
+            asset["br"] = self._sidecar(digest + ".br", lambda: brotli.compress(content, quality=11))
+        self.hashed_names[logical] = hashed
+        self.assets[hashed] = asset
+
+    def _sidecar(self, name, compress):
+        path = os.path.join(self.build_dir, name)
+        if not os.path.exists(path):
+            # Other workers may be building the same sidecar; each writes its
+            # own temp file and whichever replace lands last wins (same bytes)
+            fd, tmp_path = tempfile.mkstemp(dir=self.build_dir, prefix=name + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(compress())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return path
+
+    def serve(self, filename):
+        """Precompressed response for an asset, or None if ``filename`` isn't one.
+
+        Hashed names are cached forever; plain names (hard-coded links) still
+        get the precompressed bytes but must be revalidated.
+        """
+        asset = self.assets.get(filename)
+        immutable = asset is not None
+        if asset is None:
+            asset = self.assets.get(self.hashed_names.get(filename))
+        if asset is None:
+            return None
+        encoding = None
+        for candidate in ("br", "gzip"):
+            if asset[candidate] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        path = asset[encoding] if encoding else asset["source"]
+
+        response = send_file(path, mimetype=asset["mimetype"], conditional=True,
+                             download_name=os.path.basename(asset["source"]),
+                             etag=f"{asset['digest']}-{encoding or 'identity'}")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.headers["Cache-Control"] = self.IMMUTABLE if immutable else "no-cache"
+        return response
+
+
+static_assets = StaticAssets(app.static_folder, app.config['STATIC_BUILD_DIR'],
+                             app.config['STATIC_PIPELINE_EXTENSIONS'])
+
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """Make url_for('static', filename=...) emit the content-hashed name."""
+    if endpoint == "static" and "filename" in values:
+        values["filename"] = static_assets.hashed_names.get(values["filename"], values["filename"])
+
+
+def serve_static(filename):
+    """Static files: precompressed bytes for hashed names, plain files otherwise."""
+    response = static_assets.serve(filename)
+    if response is None:
+        response = app.send_static_file(filename)
+    return response
+
+
+app.view_functions["static"] = serve_static
+
+if app.config['STATIC_PIPELINE_ENABLED']:
+    static_assets.build()
+
+    @app.before_request
+    def rebuild_changed_static():
+        """In debug mode, pick up edited assets (e.g. the Tailwind watcher's output)."""
+        if app.debug:
+            static_assets.build()
+
+
+def warmup():
+    """Pay first-request costs at startup instead of on the first visitor.
+
+    Compiles every template (loading bytecode from the on-disk cache when
+    it is still valid) and generates month events for a window around today.
+    """
+    started = time.perf_counter()
+    templates = app.jinja_env.list_templates(extensions=["html"])
+    for name in templates:
+        app.jinja_env.get_template(name)
+
+    today = date.today()
+    first_month = today.year * 12 + today.month - 1 - app.config['WARMUP_MONTHS_BEFORE']
+    last_month = today.year * 12 + today.month - 1 + app.config['WARMUP_MONTHS_AFTER']
+    prefill_month_events(date(first_month // 12, first_month % 12 + 1, 1),
+                         date(last_month // 12, last_month % 12 + 1, 1))
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info("Warmup complete", extra={"templates": len(templates),
+                                          "months": last_month - first_month + 1,
+                                          "elapsed_ms": round(elapsed_ms)})
+
+
+if app.config['WARMUP_ENABLED']:
+    warmup()
+
+
 if __name__ == "__main__":
     print("🚀 Starting HTMX + Ty Components Demo")
     print("📝 Visit http://localhost:9000 to see the examples")
     print("🎨 Make sure Ty components are built and accessible")
-    print("🗜️  Gzip compression enabled - responses will be compressed")
+    print("🗜️  Brotli/gzip compression enabled - level adapts to load")
     print("🔍 Check compression status at: http://localhost:9000/api/compression-status")
 
+    # With the reloader this process only watches files and starts a server
+    # process that opens storage itself, so give up the journal lock here
+    if os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        storage.close()
     app.run(debug=True, host="0.0.0.0", port=9000)
\ No newline at end of file
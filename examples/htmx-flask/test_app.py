@@ -0,0 +1,141 @@
+"""Tests for the job queue's retry path, journal replay, ETag revalidation
+and LRU cache eviction.
+
+Run with ``python -m pytest`` from this directory.
+"""
+
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("TY_DEMO_JOURNAL", "0")
+
+from app import Journal, JournalError, JobQueue, LRUCache, MemoryStorage, app, make_event_fields  # noqa: E402
+
+
+def wait_for(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.status not in ("done", "failed"):
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+def flaky(failures):
+    """A job function that raises ``failures`` times, then succeeds."""
+    calls = []
+
+    def run():
+        calls.append(time.monotonic())
+        if len(calls) <= failures:
+            raise ConnectionError("Mail server unavailable")
+        return "sent"
+
+    return run, calls
+
+
+def test_job_succeeds_after_retries():
+    jobs = JobQueue(workers=1, maxsize=4, max_attempts=3, backoff=0.05, result_ttl=60)
+    run, calls = flaky(failures=2)
+    job = wait_for(jobs.submit(run))
+
+    assert job.status == "done"
+    assert job.result == "sent"
+    assert job.attempts == 3
+    assert jobs.stats()["retries"] == 2
+    # Backoff doubles: 0.05 s before the first retry, 0.1 s before the second
+    assert calls[1] - calls[0] >= 0.05
+    assert calls[2] - calls[1] >= 0.1
+
+
+def test_job_fails_after_max_attempts():
+    jobs = JobQueue(workers=1, maxsize=4, max_attempts=3, backoff=0.01, result_ttl=60)
+    run, calls = flaky(failures=5)
+    job = wait_for(jobs.submit(run))
+
+    assert job.status == "failed"
+    assert job.error == "Mail server unavailable"
+    assert len(calls) == job.attempts == 3
+    assert jobs.stats()["failed"] == 1
+
+
+def open_storage(directory):
+    storage = MemoryStorage(Journal(str(directory), snapshot_every=4))
+    storage.open()
+    return storage
+
+
+def test_journal_replays_events_after_restart(tmp_path):
+    storage = open_storage(tmp_path)
+    created = [storage.create_event(make_event_fields(f"Event {day}", f"2031-03-{day:02d}", "meeting"))
+               for day in range(1, 6)]
+    storage.delete_event(created[0]["id"])
+    storage.close()
+
+    # Five creates and a delete: a snapshot plus a journal tail to replay
+    restarted = open_storage(tmp_path)
+    try:
+        events = restarted.events_between("2031-03-01", "2031-03-31")
+        assert [event["title"] for event in events] == [f"Event {day}" for day in range(2, 6)]
+        new_event = restarted.create_event(make_event_fields("After restart", "2031-03-20", "personal"))
+        assert new_event["id"] not in {event["id"] for event in created}
+    finally:
+        restarted.close()
+
+
+def test_journal_refuses_second_owner(tmp_path):
+    storage = open_storage(tmp_path)
+    try:
+        with pytest.raises(JournalError):
+            open_storage(tmp_path)
+    finally:
+        storage.close()
+
+
+def test_range_etag_revalidates_after_write():
+    client = app.test_client()
+    url = "/api/calendar/events?from=2031-05-01&to=2031-05-31"
+    etag = client.get(url).headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/calendar/create-event",
+                data={"event_title": "Quarterly review", "event_type": "meeting", "event_date": "2031-05-10"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert "Quarterly review" in [event["title"] for event in response.get_json()["events"]]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache("test", maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_lru_cache_bounds_bytes():
+    cache = LRUCache("test", maxsize=10, max_bytes=10)
+    cache.set("a", b"x" * 4)
+    cache.set("b", b"x" * 4)
+    cache.set("c", b"x" * 4)
+    cache.set("huge", b"x" * 11)  # Larger than the whole budget, never stored
+
+    assert cache.get("a") is None and cache.get("huge") is None
+    assert cache.bytes == 8
+    assert cache.evictions == 1
+
+
+def test_lru_cache_expires_after_ttl():
+    cache = LRUCache("test", maxsize=10, ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    assert cache.expirations == 1